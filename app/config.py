@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import List
 import os
@@ -17,9 +18,70 @@ class Settings(BaseSettings):
     # CORS settings - can be overridden by environment variable
     CORS_ORIGINS: str = "http://127.0.0.1:3000,http://localhost:3000,https://gradematelk.vercel.app,https://*.vercel.app"
     
+    # PDF extraction pool settings
+    EXTRACTION_POOL_SIZE: int = 0  # 0 = one worker per CPU
+    EXTRACTION_TIMEOUT_SECONDS: float = 120.0
+    EXTRACTION_MAX_TASKS_PER_CHILD: int = 50  # Recycle workers to cap memory growth (Python 3.11+)
+    
+    # Batch upload settings
+    BATCH_CONCURRENCY: int = 4  # Files of one batch request processed at once
+    BATCH_MAX_CONCURRENCY: int = 16  # Upper bound for the per-request concurrency parameter
+    
+    # Database connection pool; blocking database calls of async endpoints
+    # run on DB_POOL_SIZE + DB_MAX_OVERFLOW threads, one per connection
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    
+    # Group commit settings: coalesce concurrent uploads into shared transactions
+    WRITE_BATCH_ENABLED: bool = False
+    WRITE_BATCH_MAX_SIZE: int = 20  # Sheets per transaction
+    WRITE_BATCH_MAX_DELAY_MS: float = 5.0  # How long to wait for more sheets
+    
+    # Extraction result cache settings
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_PATH: str = "cache/extraction_cache.sqlite3"
+    RESULT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512 MB
+    
+    # Background upload job settings
+    JOB_BACKEND: str = "memory"  # memory (single node), database (shared ingest_jobs table)
+    JOB_WORKERS: int = 2  # Workers started by the API; 0 with the database backend leaves jobs to worker.py
+    JOB_QUEUE_MAX_FILES: int = 500
+    JOB_RETENTION_SECONDS: float = 3600.0  # How long finished jobs can be polled (memory backend)
+    
+    # Database job queue settings
+    INGEST_LEASE_SECONDS: float = 60.0  # A job is retried if its worker stops heartbeating for this long
+    INGEST_POLL_INTERVAL_SECONDS: float = 1.0
+    INGEST_MAX_ATTEMPTS: int = 3
+    
+    # Seconds the total row count of /data/pdfs listings is cached for
+    PDF_COUNT_CACHE_SECONDS: float = 30.0
+    
+    # In-memory cache of PDF/question/answer lookup responses
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MB
+    RESPONSE_CACHE_WARM_ON_INGEST: bool = True  # Cache each new PDF's response in the background after upload
+    
+    # Background purge of deleted PDFs
+    PURGE_ENABLED: bool = True
+    PURGE_CHUNK_SIZE: int = 500  # Rows removed per transaction
+    PURGE_CHUNK_DELAY_SECONDS: float = 0.2  # Pause between chunks
+    PURGE_IDLE_SECONDS: float = 30.0  # How often to look for deleted PDFs when there are none
+    
+    # Seconds between reloads of the in-memory PDF name index, which picks up
+    # PDFs written by other processes; 0 loads it only once
+    PDF_NAME_INDEX_REFRESH_SECONDS: float = 300.0
+    
     # Render specific settings
     RENDER_EXTERNAL_URL: str = ""  # Will be set by Render automatically
     
+    @model_validator(mode="after")
+    def check_job_workers(self) -> "Settings":
+        """Reject settings under which queued upload jobs would never run"""
+        if self.JOB_BACKEND == "memory" and self.JOB_WORKERS < 1:
+            raise ValueError("JOB_WORKERS must be at least 1 with the memory job backend")
+        return self
+    
     @property
     def database_url(self) -> str:
         """Construct database URL from components"""
@@ -2,12 +2,21 @@
 Database CRUD operations for GradeMate application
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
-from .models import PDF, Question, Answer
+from sqlalchemy.orm import Session, defer, load_only, selectinload
+from sqlalchemy import String, and_, or_, cast, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.mysql import match as mysql_match
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .config import settings
+from .models import PDF, Question, Answer, IngestJob
+from .name_index import pdf_name_index
+from .response_cache import response_cache, pdf_tag
 from .schemas import PDFCreate, QuestionCreate, AnswerCreate
 from .utils import roman_to_int
+import base64
+import json
+import re
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,7 +26,11 @@ def create_pdf(db: Session, pdf_data: PDFCreate) -> PDF:
     """Create a new PDF record with questions and answers"""
     try:
         # Create PDF record
-        db_pdf = PDF(pdf_name=pdf_data.pdf_name)
+        db_pdf = PDF(
+            pdf_name=pdf_data.pdf_name,
+            question_count=len(pdf_data.questions),
+            answer_count=sum(len(question_data.answers) for question_data in pdf_data.questions)
+        )
         db.add(db_pdf)
         db.flush()  # Get the PDF ID
         
@@ -41,7 +54,9 @@ def create_pdf(db: Session, pdf_data: PDFCreate) -> PDF:
                 db.add(db_answer)
         
         db.commit()
+        invalidate_pdf_count()
         db.refresh(db_pdf)
+        pdf_name_index.add(db_pdf.pdf_id, db_pdf.pdf_name)
         logger.info(f"Created PDF: {db_pdf.pdf_name} with ID: {db_pdf.pdf_id}")
         return db_pdf
         
@@ -50,26 +65,171 @@ def create_pdf(db: Session, pdf_data: PDFCreate) -> PDF:
         logger.error(f"Error creating PDF: {e}")
         raise
 
+# Loads a PDF's questions and their answers in one query per level, instead
+# of one lazy load per PDF and per question when the tree is serialized
+_PDF_TREE = selectinload(PDF.questions).selectinload(Question.answers)
+_QUESTION_ANSWERS = selectinload(Question.answers)
+
+# Deleted PDFs (and their questions/answers) are hidden from every read
+# until the purger removes them
+_NOT_DELETED = PDF.deleted_at.is_(None)
+
 def get_pdf(db: Session, pdf_id: int) -> Optional[PDF]:
     """Get a PDF by ID with all questions and answers"""
-    return db.query(PDF).filter(PDF.pdf_id == pdf_id).first()
+    return db.query(PDF).options(_PDF_TREE).filter(PDF.pdf_id == pdf_id, _NOT_DELETED).first()
+
+def get_pdfs_by_ids(db: Session, pdf_ids: List[int]) -> List[PDF]:
+    """Get several PDFs with all questions and answers, in no particular order"""
+    return db.query(PDF).options(_PDF_TREE).filter(PDF.pdf_id.in_(set(pdf_ids)), _NOT_DELETED).all()
 
 def get_pdf_by_name(db: Session, pdf_name: str) -> Optional[PDF]:
     """Get a PDF by name"""
-    return db.query(PDF).filter(PDF.pdf_name == pdf_name).first()
+    return db.query(PDF).filter(PDF.pdf_name == pdf_name, _NOT_DELETED).first()
+
+def get_pdf_by_hash(db: Session, content_sha256: str, with_tree: bool = False) -> Optional[PDF]:
+    """Get a PDF by the SHA-256 hash of its file content, optionally with all questions and answers"""
+    query = db.query(PDF)
+    if with_tree:
+        query = query.options(_PDF_TREE)
+    return query.filter(PDF.content_sha256 == content_sha256, _NOT_DELETED).first()
+
+# Position of a PDF in listings: (uploaded_at, pdf_id)
+PDFPageKey = Tuple[datetime, int]
+
+# Cached COUNT(*) of pdfs, since exact counts get slow on large tables
+_pdf_count_cache = {"total": None, "expires_at": 0.0}
+
+def _paginate_pdfs(query, skip: int, limit: int, after: Optional[PDFPageKey]):
+    """Order a PDF query for listings and apply the cursor and offset/limit"""
+    query = query.filter(_NOT_DELETED)
+    if after:
+        uploaded_at, pdf_id = after
+        query = query.filter(or_(
+            PDF.uploaded_at > uploaded_at,
+            and_(PDF.uploaded_at == uploaded_at, PDF.pdf_id > pdf_id)
+        ))
+    return query.order_by(PDF.uploaded_at, PDF.pdf_id).offset(skip).limit(limit)
+
+def get_pdfs(db: Session, skip: int = 0, limit: int = 100, after: Optional[PDFPageKey] = None) -> List[PDF]:
+    """
+    Get all PDFs with pagination
+    
+    PDFs are ordered by (uploaded_at, pdf_id); pass the key of the last PDF
+    of the previous page as after to continue from it without an OFFSET scan.
+    """
+    return _paginate_pdfs(db.query(PDF).options(_PDF_TREE), skip, limit, after).all()
+
+def get_pdf_summaries(db: Session, skip: int = 0, limit: int = 100, after: Optional[PDFPageKey] = None) -> List[PDF]:
+    """Get PDFs with pagination (as get_pdfs), loading only the columns needed for a listing"""
+    query = db.query(PDF).options(
+        load_only(PDF.pdf_id, PDF.pdf_name, PDF.uploaded_at, PDF.question_count, PDF.answer_count, PDF.version)
+    )
+    return _paginate_pdfs(query, skip, limit, after).all()
+
+def get_pdf_versions(db: Session, skip: int = 0, limit: int = 100, after: Optional[PDFPageKey] = None) -> List[Any]:
+    """Get (pdf_id, version, uploaded_at) rows of the PDFs get_pdfs would return"""
+    query = db.query(PDF.pdf_id, PDF.version, PDF.uploaded_at)
+    return _paginate_pdfs(query, skip, limit, after).all()
+
+def get_pdf_version(db: Session, pdf_id: int) -> Optional[int]:
+    """Get the version of a PDF, or None if it doesn't exist"""
+    return db.query(PDF.version).filter(PDF.pdf_id == pdf_id, _NOT_DELETED).scalar()
+
+def encode_pdf_cursor(pdf: PDF) -> str:
+    """Encode the listing position of a PDF as an opaque cursor"""
+    raw = json.dumps([pdf.uploaded_at.isoformat(), pdf.pdf_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_pdf_cursor(cursor: str) -> PDFPageKey:
+    """
+    Decode a cursor made by encode_pdf_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        uploaded_at, pdf_id = json.loads(raw)
+        return datetime.fromisoformat(uploaded_at), int(pdf_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+def split_pdf_page(pdfs: List[PDF], limit: int) -> Tuple[List[PDF], Optional[str]]:
+    """
+    Split up to limit + 1 fetched PDFs into a page and the cursor of the next page
+    
+    Returns:
+        Tuple of (page, next_cursor), next_cursor being None on the last page
+    """
+    if len(pdfs) > limit:
+        return pdfs[:limit], encode_pdf_cursor(pdfs[limit - 1])
+    return pdfs, None
+
+def count_pdfs(db: Session) -> int:
+    """Get the total number of PDFs, cached for PDF_COUNT_CACHE_SECONDS"""
+    now = time.monotonic()
+    if _pdf_count_cache["total"] is None or now >= _pdf_count_cache["expires_at"]:
+        total = db.query(func.count(PDF.pdf_id)).filter(_NOT_DELETED).scalar()
+        _pdf_count_cache.update(total=total, expires_at=now + settings.PDF_COUNT_CACHE_SECONDS)
+    return _pdf_count_cache["total"]
+
+def invalidate_pdf_count() -> None:
+    """Make the next count_pdfs call count again"""
+    _pdf_count_cache["expires_at"] = 0.0
+
+def adjust_pdf_counts(db: Session, pdf_id, questions: int = 0, answers: int = 0) -> None:
+    """
+    Add to a PDF's question_count/answer_count and bump its version, without loading it
+    
+    Not committed.
+    """
+    db.execute(
+        update(PDF)
+        .where(PDF.pdf_id == pdf_id)
+        .values(
+            question_count=PDF.question_count + questions,
+            answer_count=PDF.answer_count + answers,
+            version=PDF.version + 1,
+            updated_at=func.current_timestamp()
+        )
+        .execution_options(synchronize_session=False)
+    )
 
-def get_pdfs(db: Session, skip: int = 0, limit: int = 100) -> List[PDF]:
-    """Get all PDFs with pagination"""
-    return db.query(PDF).offset(skip).limit(limit).all()
+def _soft_delete_pdfs(db: Session, condition):
+    """
+    Mark PDFs deleted; not committed
+    
+    The name and content hash are released right away, so the same file can
+    be uploaded again before the purger has removed the old rows.
+    """
+    return db.execute(
+        update(PDF)
+        .where(condition, _NOT_DELETED)
+        .values(
+            deleted_at=func.current_timestamp(),
+            pdf_name=literal("deleted:").concat(cast(PDF.pdf_id, String)),
+            content_sha256=None,
+            version=PDF.version + 1,
+            updated_at=func.current_timestamp()
+        )
+        .execution_options(synchronize_session=False)
+    )
 
 def delete_pdf(db: Session, pdf_id: int) -> bool:
-    """Delete a PDF and all its questions/answers (cascade)"""
+    """
+    Delete a PDF and all its questions/answers
+    
+    The PDF is hidden from reads immediately; its rows are removed later, in
+    small chunks, by the background purger (see purge_deleted_pdf_chunk).
+    """
     try:
-        pdf = db.query(PDF).filter(PDF.pdf_id == pdf_id).first()
-        if pdf:
-            db.delete(pdf)
-            db.commit()
-            logger.info(f"Deleted PDF: {pdf.pdf_name} with ID: {pdf_id}")
+        result = _soft_delete_pdfs(db, PDF.pdf_id == pdf_id)
+        db.commit()
+        if result.rowcount:
+            invalidate_pdf_count()
+            response_cache.invalidate(pdf_tag(pdf_id))
+            pdf_name_index.remove(pdf_id)
+            logger.info(f"Deleted PDF with ID: {pdf_id}")
             return True
         return False
     except Exception as e:
@@ -77,22 +237,149 @@ def delete_pdf(db: Session, pdf_id: int) -> bool:
         logger.error(f"Error deleting PDF: {e}")
         raise
 
+def delete_pdfs(db: Session, pdf_ids: List[int]) -> List[int]:
+    """
+    Delete several PDFs and all their questions/answers with one statement (see delete_pdf)
+    
+    Returns:
+        IDs of the PDFs that existed and were deleted
+    """
+    try:
+        found_ids = [
+            pdf_id for (pdf_id,) in
+            db.query(PDF.pdf_id).filter(PDF.pdf_id.in_(pdf_ids), _NOT_DELETED).with_for_update().all()
+        ]
+        if not found_ids:
+            db.rollback()
+            return []
+        _soft_delete_pdfs(db, PDF.pdf_id.in_(found_ids))
+        db.commit()
+        invalidate_pdf_count()
+        for pdf_id in found_ids:
+            response_cache.invalidate(pdf_tag(pdf_id))
+            pdf_name_index.remove(pdf_id)
+        logger.info(f"Deleted {len(found_ids)} PDFs")
+        return found_ids
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error deleting PDFs: {e}")
+        raise
+
+def load_pdf_name_index(db: Session) -> None:
+    """(Re)load the in-memory PDF name index from the database"""
+    if not pdf_name_index.begin_load():
+        return
+    try:
+        rows = db.query(PDF.pdf_id, PDF.pdf_name).filter(_NOT_DELETED).all()
+    except Exception as e:
+        pdf_name_index.abort_load()
+        logger.error(f"Error loading PDF name index: {e}")
+        raise
+    pdf_name_index.finish_load(rows)
+    logger.info(f"Loaded {len(pdf_name_index)} PDF names into the name index")
+
+def get_deleted_pdf_ids(db: Session, limit: int = 100) -> List[int]:
+    """Get IDs of deleted PDFs whose rows have not been purged yet"""
+    query = db.query(PDF.pdf_id).filter(PDF.deleted_at.isnot(None)).order_by(PDF.deleted_at).limit(limit)
+    return [pdf_id for (pdf_id,) in query.all()]
+
+def purge_deleted_pdf_chunk(db: Session, pdf_id: int, chunk_size: int) -> int:
+    """
+    Remove up to chunk_size rows of a deleted PDF, answers first, then questions, then the PDF
+    
+    Each call is one short transaction, so purging a large PDF never holds
+    locks on many rows at once.
+    
+    Returns:
+        Number of rows removed; 0 once the PDF is gone
+    """
+    try:
+        answer_ids = [
+            answer_id for (answer_id,) in
+            db.query(Answer.answer_id)
+            .join(Question, Answer.question_id == Question.question_id)
+            .filter(Question.pdf_id == pdf_id)
+            .limit(chunk_size)
+            .all()
+        ]
+        if answer_ids:
+            db.execute(delete(Answer).where(Answer.answer_id.in_(answer_ids)).execution_options(synchronize_session=False))
+            db.commit()
+            return len(answer_ids)
+        
+        question_ids = [
+            question_id for (question_id,) in
+            db.query(Question.question_id).filter(Question.pdf_id == pdf_id).limit(chunk_size).all()
+        ]
+        if question_ids:
+            db.execute(delete(Question).where(Question.question_id.in_(question_ids)).execution_options(synchronize_session=False))
+            db.commit()
+            return len(question_ids)
+        
+        result = db.execute(
+            delete(PDF).where(PDF.pdf_id == pdf_id, PDF.deleted_at.isnot(None)).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error purging PDF {pdf_id}: {e}")
+        raise
+
 # -------- Question Operations --------
 def get_questions_by_pdf(db: Session, pdf_id: int) -> List[Question]:
     """Get all questions for a specific PDF"""
-    return db.query(Question).filter(Question.pdf_id == pdf_id).all()
+    return (
+        db.query(Question).options(_QUESTION_ANSWERS)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(Question.pdf_id == pdf_id, _NOT_DELETED)
+        .all()
+    )
 
 def get_question(db: Session, question_id: int) -> Optional[Question]:
     """Get a question by ID with all answers"""
-    return db.query(Question).filter(Question.question_id == question_id).first()
+    return (
+        db.query(Question).options(_QUESTION_ANSWERS)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(Question.question_id == question_id, _NOT_DELETED)
+        .first()
+    )
+
+def get_questions_by_ids(db: Session, question_ids: List[int]) -> List[Question]:
+    """Get several questions with all answers, in no particular order"""
+    return (
+        db.query(Question).options(_QUESTION_ANSWERS)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(Question.question_id.in_(set(question_ids)), _NOT_DELETED)
+        .all()
+    )
+
+def get_question_version(db: Session, question_id: int) -> Optional[int]:
+    """Get the version of the PDF a question belongs to, or None if the question doesn't exist"""
+    return (
+        db.query(PDF.version)
+        .join(Question, Question.pdf_id == PDF.pdf_id)
+        .filter(Question.question_id == question_id, _NOT_DELETED)
+        .scalar()
+    )
 
 def delete_question(db: Session, question_id: int) -> bool:
-    """Delete a question and all its answers (cascade)"""
+    """Delete a question and all its answers (database cascade, nothing is loaded)"""
     try:
-        question = db.query(Question).filter(Question.question_id == question_id).first()
-        if question:
-            db.delete(question)
+        pdf_id = (
+            db.query(Question.pdf_id)
+            .join(PDF, Question.pdf_id == PDF.pdf_id)
+            .filter(Question.question_id == question_id, _NOT_DELETED)
+            .scalar()
+        )
+        if pdf_id is not None:
+            answer_count = db.query(func.count(Answer.answer_id)).filter(Answer.question_id == question_id).scalar()
+            adjust_pdf_counts(db, pdf_id, questions=-1, answers=-answer_count)
+            db.execute(
+                delete(Question).where(Question.question_id == question_id).execution_options(synchronize_session=False)
+            )
             db.commit()
+            response_cache.invalidate(pdf_tag(pdf_id))
             logger.info(f"Deleted question with ID: {question_id}")
             return True
         return False
@@ -104,19 +391,59 @@ def delete_question(db: Session, question_id: int) -> bool:
 # -------- Answer Operations --------
 def get_answers_by_question(db: Session, question_id: int) -> List[Answer]:
     """Get all answers for a specific question"""
-    return db.query(Answer).filter(Answer.question_id == question_id).all()
+    return (
+        db.query(Answer)
+        .join(Question, Answer.question_id == Question.question_id)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(Answer.question_id == question_id, _NOT_DELETED)
+        .all()
+    )
 
 def get_answer(db: Session, answer_id: int) -> Optional[Answer]:
     """Get an answer by ID"""
-    return db.query(Answer).filter(Answer.answer_id == answer_id).first()
+    return (
+        db.query(Answer)
+        .join(Question, Answer.question_id == Question.question_id)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(Answer.answer_id == answer_id, _NOT_DELETED)
+        .first()
+    )
+
+def get_answers_by_ids(db: Session, answer_ids: List[int]) -> List[Answer]:
+    """Get several answers, in no particular order"""
+    return (
+        db.query(Answer)
+        .join(Question, Answer.question_id == Question.question_id)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(Answer.answer_id.in_(set(answer_ids)), _NOT_DELETED)
+        .all()
+    )
+
+def get_answer_version(db: Session, answer_id: int) -> Optional[int]:
+    """Get the version of the PDF an answer belongs to, or None if the answer doesn't exist"""
+    return (
+        db.query(PDF.version)
+        .join(Question, Question.pdf_id == PDF.pdf_id)
+        .join(Answer, Answer.question_id == Question.question_id)
+        .filter(Answer.answer_id == answer_id, _NOT_DELETED)
+        .scalar()
+    )
 
 def delete_answer(db: Session, answer_id: int) -> bool:
     """Delete an answer"""
     try:
-        answer = db.query(Answer).filter(Answer.answer_id == answer_id).first()
-        if answer:
-            db.delete(answer)
+        pdf_id = (
+            db.query(Question.pdf_id)
+            .join(Answer, Answer.question_id == Question.question_id)
+            .join(PDF, Question.pdf_id == PDF.pdf_id)
+            .filter(Answer.answer_id == answer_id, _NOT_DELETED)
+            .scalar()
+        )
+        if pdf_id is not None:
+            adjust_pdf_counts(db, pdf_id, answers=-1)
+            db.execute(delete(Answer).where(Answer.answer_id == answer_id).execution_options(synchronize_session=False))
             db.commit()
+            response_cache.invalidate(pdf_tag(pdf_id))
             logger.info(f"Deleted answer with ID: {answer_id}")
             return True
         return False
@@ -125,8 +452,184 @@ def delete_answer(db: Session, answer_id: int) -> bool:
         logger.error(f"Error deleting answer: {e}")
         raise
 
+# -------- Answer Search --------
+class SearchUnsupportedError(Exception):
+    """Raised when the database has no full-text index to search answers with"""
+    pass
+
+_SEARCH_TERM = re.compile(r"\w+")
+
+# Length of the answer text excerpt returned with each search hit
+SNIPPET_CHARS = 160
+
+def search_terms(query: str) -> List[str]:
+    """Split a search query into lowercase words"""
+    return _SEARCH_TERM.findall(query.lower())
+
+def answer_snippet(answer_text: str, terms: List[str], width: int = SNIPPET_CHARS) -> str:
+    """Excerpt of an answer around the first occurrence of a search term"""
+    lowered = answer_text.lower()
+    positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = " ".join(answer_text[start:start + width].split())
+    if start > 0:
+        snippet = "…" + snippet
+    if start + width < len(answer_text):
+        snippet += "…"
+    return snippet
+
+def search_answers(db: Session, query: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Full-text search of answer texts, best matches first
+    
+    Uses the FULLTEXT index on MySQL; any word of the query may match. Answers of deleted PDFs are left out.
+    
+    Raises:
+        SearchUnsupportedError: If the database is not MySQL
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    
+    columns = (
+        Answer.answer_id, Answer.question_id, Question.pdf_id, PDF.pdf_name,
+        Question.main_no, Answer.roman_text, Answer.part_no, Answer.answer_text
+    )
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        score = mysql_match(Answer.answer_text, against=" ".join(terms)).in_natural_language_mode()
+        search = db.query(*columns, score.label("score")).select_from(Answer).filter(score)
+    else:
+        raise SearchUnsupportedError(f"Full-text search is not supported on {dialect}")
+    
+    rows = (
+        search
+        .join(Question, Answer.question_id == Question.question_id)
+        .join(PDF, Question.pdf_id == PDF.pdf_id)
+        .filter(_NOT_DELETED)
+        .order_by(score.desc(), Answer.answer_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "answer_id": row.answer_id,
+            "question_id": row.question_id,
+            "pdf_id": row.pdf_id,
+            "pdf_name": row.pdf_name,
+            "main_no": row.main_no,
+            "roman_text": row.roman_text,
+            "part_no": row.part_no,
+            "snippet": answer_snippet(row.answer_text, terms),
+            "score": float(row.score)
+        }
+        for row in rows
+    ]
+
+# -------- Export --------
+def iter_answer_export_rows(
+    db: Session,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    batch_size: int = 1000
+) -> Iterator[Any]:
+    """
+    Stream (pdf_name, main_no, roman_text, part_no, answer_text) of every answer
+    
+    Rows are read from a server-side cursor batch_size at a time, so memory
+    use stays flat however many answers there are. Answers of deleted PDFs
+    are left out; uploaded_from is inclusive and uploaded_to exclusive.
+    """
+    query = (
+        select(PDF.pdf_name, Question.main_no, Answer.roman_text, Answer.part_no, Answer.answer_text)
+        .select_from(PDF)
+        .join(Question, Question.pdf_id == PDF.pdf_id)
+        .join(Answer, Answer.question_id == Question.question_id)
+        .where(_NOT_DELETED)
+        .order_by(PDF.pdf_id, Question.main_no, Answer.part_no)
+    )
+    if uploaded_from is not None:
+        query = query.where(PDF.uploaded_at >= uploaded_from)
+    if uploaded_to is not None:
+        query = query.where(PDF.uploaded_at < uploaded_to)
+    
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        yield from result
+    finally:
+        result.close()
+
 # -------- Utility Functions --------
-def create_pdf_from_parsed_data(db: Session, pdf_name: str, parsed_questions: dict) -> PDF:
+def insert_parsed_pdf(db: Session, pdf_name: str, parsed_questions: dict, content_sha256: Optional[str] = None) -> PDF:
+    """
+    Insert a PDF and its parsed questions/answers with bulk statements, without committing
+    
+    Issues a fixed number of statements regardless of sheet size: the PDF
+    insert, one multi-row question insert, one query for the question IDs
+    and one executemany for the answers.
+    
+    Args:
+        db: Database session
+        pdf_name: Name of the PDF file
+        parsed_questions: Parsed question dictionary (see create_pdf_from_parsed_data)
+        content_sha256: Hex SHA-256 of the PDF file, used to detect re-uploads
+    
+    Returns:
+        The flushed PDF object
+    """
+    # Validate everything before touching the database
+    question_nums = []
+    answers_by_question = {}
+    for question_num_str, answers_dict in parsed_questions.items():
+        question_num = int(question_num_str)
+        question_nums.append(question_num)
+        
+        answers = []
+        for roman_text, answer_text in answers_dict.items():
+            try:
+                part_no = roman_to_int(roman_text)
+            except ValueError as e:
+                logger.warning(f"Invalid Roman numeral '{roman_text}' in question {question_num}: {e}")
+                continue
+            answers.append({"roman_text": roman_text, "part_no": part_no, "answer_text": answer_text})
+        answers_by_question[question_num] = answers
+    
+    # Create PDF record, with its counters already known
+    db_pdf = PDF(
+        pdf_name=pdf_name,
+        content_sha256=content_sha256,
+        question_count=len(question_nums),
+        answer_count=sum(len(answers) for answers in answers_by_question.values())
+    )
+    db.add(db_pdf)
+    db.flush()  # Get the PDF ID
+    
+    question_rows = [{"pdf_id": db_pdf.pdf_id, "main_no": question_num} for question_num in question_nums]
+    
+    if not question_rows:
+        return db_pdf
+    
+    # All questions in one multi-row INSERT, then their IDs in one query
+    db.execute(insert(Question).values(question_rows))
+    question_ids = dict(
+        db.execute(
+            select(Question.main_no, Question.question_id).where(Question.pdf_id == db_pdf.pdf_id)
+        ).all()
+    )
+    
+    # All answers in one executemany
+    answer_rows = [
+        {"question_id": question_ids[question_num], **answer}
+        for question_num, answers in answers_by_question.items()
+        for answer in answers
+    ]
+    if answer_rows:
+        db.execute(insert(Answer), answer_rows)
+    
+    return db_pdf
+
+def create_pdf_from_parsed_data(db: Session, pdf_name: str, parsed_questions: dict, content_sha256: Optional[str] = None) -> PDF:
     """
     Create a PDF record from parsed question data
     
@@ -138,52 +641,228 @@ def create_pdf_from_parsed_data(db: Session, pdf_name: str, parsed_questions: di
                 "1": {"i": "answer text", "ii": "answer text"},
                 "2": {"i": "answer text", "iii": "answer text"}
             }
+        content_sha256: Hex SHA-256 of the PDF file, used to detect re-uploads
     
     Returns:
         Created PDF object
     """
     try:
-        # Create PDF record
-        db_pdf = PDF(pdf_name=pdf_name)
-        db.add(db_pdf)
-        db.flush()  # Get the PDF ID
-        
-        # Process each question
-        for question_num_str, answers_dict in parsed_questions.items():
-            question_num = int(question_num_str)
-            
-            # Create question record
-            db_question = Question(
-                pdf_id=db_pdf.pdf_id,
-                main_no=question_num
-            )
-            db.add(db_question)
-            db.flush()  # Get the question ID
-            
-            # Process each answer for this question
-            for roman_text, answer_text in answers_dict.items():
-                try:
-                    part_no = roman_to_int(roman_text)
-                    
-                    # Create answer record
-                    db_answer = Answer(
-                        question_id=db_question.question_id,
-                        roman_text=roman_text,
-                        part_no=part_no,
-                        answer_text=answer_text
-                    )
-                    db.add(db_answer)
-                    
-                except ValueError as e:
-                    logger.warning(f"Invalid Roman numeral '{roman_text}' in question {question_num}: {e}")
-                    continue
-        
+        db_pdf = insert_parsed_pdf(db, pdf_name, parsed_questions, content_sha256)
+        pdf_id = db_pdf.pdf_id
         db.commit()
-        db.refresh(db_pdf)
-        logger.info(f"Created PDF from parsed data: {db_pdf.pdf_name} with ID: {db_pdf.pdf_id}")
+        invalidate_pdf_count()
+        pdf_name_index.add(pdf_id, pdf_name)
+        logger.info(f"Created PDF from parsed data: {pdf_name} with ID: {pdf_id}")
         return db_pdf
         
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating PDF from parsed data: {e}")
         raise
+
+def parsed_questions_from_pdf(pdf: PDF) -> dict:
+    """
+    Rebuild the parsed question dictionary from a stored PDF
+    
+    Returns:
+        Dictionary in the same format accepted by create_pdf_from_parsed_data
+    """
+    return {
+        str(question.main_no): {
+            answer.roman_text: answer.answer_text
+            for answer in sorted(question.answers, key=lambda a: a.part_no)
+        }
+        for question in sorted(pdf.questions, key=lambda q: q.main_no)
+    }
+
+# -------- Ingest Job Operations --------
+def create_ingest_jobs(db: Session, job_id: str, files: List[Dict[str, Any]]) -> List[IngestJob]:
+    """
+    Queue the files of one upload request as ingest jobs
+    
+    Args:
+        db: Database session
+        job_id: Public job ID shared by all files of the request
+        files: Dictionaries with "filename" and either "pdf_data" and
+            "content_sha256", or "error" for files rejected up front
+    """
+    try:
+        jobs = []
+        for index, file in enumerate(files):
+            if "error" in file:
+                job = IngestJob(
+                    job_id=job_id,
+                    file_index=index,
+                    filename=file["filename"],
+                    status="failed",
+                    result=json.dumps({"filename": file["filename"], "status": "error", "error": file["error"]}),
+                    finished_at=datetime.utcnow()
+                )
+            else:
+                job = IngestJob(
+                    job_id=job_id,
+                    file_index=index,
+                    filename=file["filename"],
+                    content_sha256=file["content_sha256"],
+                    pdf_data=file["pdf_data"],
+                    status="queued"
+                )
+            db.add(job)
+            jobs.append(job)
+        
+        db.commit()
+        logger.info(f"Queued ingest job {job_id} with {len(files)} files")
+        return jobs
+    
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error queueing ingest job {job_id}: {e}")
+        raise
+
+def get_ingest_jobs(db: Session, job_id: str) -> List[IngestJob]:
+    """Get the per-file ingest jobs of an upload request, without the PDF bytes"""
+    return (
+        db.query(IngestJob)
+        .options(defer(IngestJob.pdf_data))
+        .filter(IngestJob.job_id == job_id)
+        .order_by(IngestJob.file_index)
+        .all()
+    )
+
+def count_queued_ingest_jobs(db: Session) -> int:
+    """Count ingest jobs waiting to be processed"""
+    return db.query(IngestJob).filter(IngestJob.status == "queued").count()
+
+def claim_ingest_job(db: Session, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[IngestJob]:
+    """
+    Claim the next queued (or lease-expired) ingest job for a worker
+    
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+    workers can claim from the same table without blocking each other.
+    Jobs whose lease expired max_attempts times are marked failed.
+    
+    Returns:
+        The claimed job with its lease set, or None if there is nothing to do
+    """
+    try:
+        while True:
+            now = datetime.utcnow()
+            job = (
+                db.query(IngestJob)
+                .filter(or_(
+                    IngestJob.status == "queued",
+                    and_(IngestJob.status == "processing", IngestJob.lease_expires_at < now)
+                ))
+                .order_by(IngestJob.ingest_job_id)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if not job:
+                db.rollback()
+                return None
+            
+            if job.attempts >= max_attempts:
+                # The lease expired on every attempt, most likely the PDF kills workers
+                job.status = "failed"
+                job.result = json.dumps({"filename": job.filename, "status": "error", "error": f"Gave up after {job.attempts} attempts"})
+                job.pdf_data = None
+                job.lease_owner = None
+                job.lease_expires_at = None
+                job.finished_at = now
+                db.commit()
+                logger.warning(f"Ingest job {job.job_id}/{job.file_index} failed after {job.attempts} attempts")
+                continue
+            
+            # Conditional update, so a job is never handed out twice even on
+            # databases without SKIP LOCKED (e.g. SQLite in development)
+            claimed = (
+                db.query(IngestJob)
+                .filter(IngestJob.ingest_job_id == job.ingest_job_id, IngestJob.attempts == job.attempts)
+                .update({
+                    IngestJob.status: "processing",
+                    IngestJob.attempts: job.attempts + 1,
+                    IngestJob.lease_owner: worker_id,
+                    IngestJob.lease_expires_at: now + timedelta(seconds=lease_seconds)
+                }, synchronize_session=False)
+            )
+            db.commit()
+            if not claimed:
+                continue
+            db.refresh(job)
+            return job
+    
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error claiming ingest job: {e}")
+        raise
+
+def extend_ingest_job_lease(db: Session, ingest_job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """
+    Heartbeat: extend the lease on a job the worker still owns
+    
+    Returns:
+        False if the lease was lost to another worker
+    """
+    try:
+        updated = (
+            db.query(IngestJob)
+            .filter(IngestJob.ingest_job_id == ingest_job_id, IngestJob.lease_owner == worker_id)
+            .update({IngestJob.lease_expires_at: datetime.utcnow() + timedelta(seconds=lease_seconds)}, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error extending lease on ingest job {ingest_job_id}: {e}")
+        raise
+
+def finish_ingest_job(db: Session, ingest_job_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+    """
+    Record the upload result of a job the worker still owns
+    
+    Returns:
+        False if the lease was lost to another worker
+    """
+    try:
+        updated = (
+            db.query(IngestJob)
+            .filter(IngestJob.ingest_job_id == ingest_job_id, IngestJob.lease_owner == worker_id)
+            .update({
+                IngestJob.status: "failed" if result["status"] == "error" else "done",
+                IngestJob.result: json.dumps(result),
+                IngestJob.pdf_data: None,
+                IngestJob.lease_owner: None,
+                IngestJob.lease_expires_at: None,
+                IngestJob.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error finishing ingest job {ingest_job_id}: {e}")
+        raise
+
+def release_ingest_job(db: Session, ingest_job_id: int, worker_id: str) -> bool:
+    """
+    Give a job back to the queue after an unexpected worker error
+    
+    Returns:
+        False if the lease was already lost to another worker
+    """
+    try:
+        updated = (
+            db.query(IngestJob)
+            .filter(IngestJob.ingest_job_id == ingest_job_id, IngestJob.lease_owner == worker_id)
+            .update({
+                IngestJob.status: "queued",
+                IngestJob.lease_owner: None,
+                IngestJob.lease_expires_at: None
+            }, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error releasing ingest job {ingest_job_id}: {e}")
+        raise
@@ -1,8 +1,11 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from .config import settings
 from .models import Base
+import asyncio
 import logging
 
 # Configure logging
@@ -13,8 +16,8 @@ logger = logging.getLogger(__name__)
 engine = create_engine(
     settings.database_url,
     poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
     echo=settings.ENVIRONMENT == "development"  # Log SQL queries in development
 )
@@ -22,6 +25,28 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Threads for blocking database work of async endpoints. One per pooled
+# connection: more threads would only wait for a connection, fewer would
+# leave connections idle while requests queue.
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    thread_name_prefix="db"
+)
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run a blocking database function on the database executor
+    
+    Keeps slow queries from freezing the event loop, so unrelated requests
+    (and health checks) are still served while they run.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """Stop the database executor threads"""
+    db_executor.shutdown(wait=True)
+
 def create_tables():
     """Create all tables in the database"""
     try:
@@ -47,6 +72,14 @@ def get_db_session() -> Session:
     """
     return SessionLocal()
 
+def with_db_session(func, *args):
+    """Call func(db, *args) with its own short-lived session, closed afterwards"""
+    db = get_db_session()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
 def test_connection():
     """Test database connection"""
     try:
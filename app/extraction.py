@@ -0,0 +1,129 @@
+"""
+Extraction executor for GradeMate application
+
+PyMuPDF text extraction is CPU-bound, so PDFs are processed in a bounded
+process pool instead of on the event loop. Results are looked up in and
+saved to the disk-backed result cache when the content hash is known.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .pdf_extractor import process_pdf
+from .result_cache import get_result_cache
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ProcessPoolExecutor:
+    """Get the extraction process pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            kwargs = {"max_workers": settings.EXTRACTION_POOL_SIZE or None}
+            # max_tasks_per_child is only available on Python 3.11+
+            if settings.EXTRACTION_MAX_TASKS_PER_CHILD and sys.version_info >= (3, 11):
+                kwargs["max_tasks_per_child"] = settings.EXTRACTION_MAX_TASKS_PER_CHILD
+            _executor = ProcessPoolExecutor(**kwargs)
+            logger.info(f"Started extraction pool (size: {settings.EXTRACTION_POOL_SIZE or 'cpu count'})")
+        return _executor
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shut down the extraction process pool"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("Extraction pool shut down")
+
+def _discard_broken_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Drop a broken pool so the next job starts a new one
+    
+    Only the given pool is shut down: if another request already replaced
+    it, the replacement and its jobs are left alone.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _failed_result(error: str) -> Dict[str, Any]:
+    """Build a process_pdf-shaped failure result"""
+    return {
+        "success": False,
+        "error": error,
+        "extracted_text": "",
+        "parsed_questions": {},
+        "question_count": 0
+    }
+
+async def run_process_pdf(pdf_data: bytes, name: str = "") -> Dict[str, Any]:
+    """
+    Run process_pdf in the extraction pool without blocking the event loop
+    
+    Args:
+        pdf_data: Raw PDF bytes (sent to the worker process as-is)
+        name: File name, used for logging only
+    
+    Returns:
+        The process_pdf result dictionary, or a failure result if the job
+        timed out or the worker process died
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    
+    try:
+        # Submitting to a pool that broke after we got it raises BrokenProcessPool too
+        future = loop.run_in_executor(executor, process_pdf, pdf_data)
+        return await asyncio.wait_for(future, timeout=settings.EXTRACTION_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        # The worker keeps running the job until it finishes; we only stop waiting
+        logger.error(f"PDF extraction timed out after {settings.EXTRACTION_TIMEOUT_SECONDS}s: {name}")
+        return _failed_result(f"PDF extraction timed out after {settings.EXTRACTION_TIMEOUT_SECONDS} seconds")
+    except BrokenProcessPool as e:
+        # A worker crashed (e.g. PyMuPDF segfault); replace the pool for later jobs
+        logger.error(f"Extraction pool broken while processing {name}: {e}")
+        _discard_broken_executor(executor)
+        return _failed_result("PDF extraction worker crashed")
+
+async def extract_pdf(pdf_data: bytes, content_sha256: Optional[str] = None, name: str = "") -> Dict[str, Any]:
+    """
+    Get the process_pdf result for a PDF, using the result cache when possible
+    
+    Args:
+        pdf_data: Raw PDF bytes
+        content_sha256: Hex SHA-256 of pdf_data; the cache is skipped if not given
+        name: File name, used for logging only
+    """
+    cache = get_result_cache() if content_sha256 else None
+    loop = asyncio.get_running_loop()
+    
+    if cache:
+        try:
+            cached = await loop.run_in_executor(None, cache.get, content_sha256)
+            if cached:
+                logger.info(f"Using cached extraction result for {name}")
+                return cached
+        except Exception as e:
+            logger.error(f"Result cache lookup failed for {name}: {e}")
+    
+    result = await run_process_pdf(pdf_data, name)
+    
+    if cache and result["success"]:
+        try:
+            await loop.run_in_executor(None, cache.put, content_sha256, result)
+        except Exception as e:
+            logger.error(f"Could not cache extraction result for {name}: {e}")
+    
+    return result
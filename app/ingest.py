@@ -0,0 +1,223 @@
+"""
+Upload ingestion pipeline for GradeMate application
+
+Shared by the upload endpoints and the background job workers: check for
+an identical stored PDF, extract and parse, then save to the database.
+"""
+
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+import asyncio
+from .extraction import extract_pdf
+from .result_cache import get_result_cache
+from .crud import create_pdf_from_parsed_data, get_pdf_by_name, get_pdf_by_hash, parsed_questions_from_pdf
+from .config import settings
+from .database import run_db
+from .response_cache import response_cache
+from .serializers import warm_pdf_response
+from .write_batcher import write_batcher, SAME_NAME, SAME_CONTENT
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cache warm-ups still running; referenced so they aren't garbage collected mid-flight
+_warm_tasks = set()
+
+def schedule_cache_warm(pdf_id: int) -> None:
+    """Encode a new PDF's response into the response cache in the background"""
+    task = asyncio.create_task(run_db(warm_pdf_response, pdf_id))
+    _warm_tasks.add(task)
+    task.add_done_callback(_warm_tasks.discard)
+
+def find_duplicate_upload(db: Session, filename: str, content_sha256: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up an already stored PDF with the same file content
+    
+    Returns:
+        Upload result dictionary for the existing PDF, or None if the
+        content is new (or the database is unavailable)
+    """
+    try:
+        existing_pdf = get_pdf_by_hash(db, content_sha256, with_tree=True)
+    except Exception as db_error:
+        logger.error(f"Database error while checking for duplicate of {filename}: {db_error}")
+        return None
+    
+    if not existing_pdf:
+        return None
+    
+    logger.info(f"PDF {filename} has the same content as PDF ID: {existing_pdf.pdf_id}, skipping extraction")
+    parsed_questions = parsed_questions_from_pdf(existing_pdf)
+    
+    # The raw text isn't stored in the database, but may still be cached
+    extracted_text = ""
+    cache = get_result_cache()
+    if cache:
+        try:
+            cached = cache.get(content_sha256)
+            if cached:
+                extracted_text = cached["extracted_text"]
+        except Exception as e:
+            logger.error(f"Result cache lookup failed for {filename}: {e}")
+    
+    return {
+        "filename": filename,
+        "extracted_text": extracted_text,
+        "parsed_questions": parsed_questions,
+        "question_count": len(parsed_questions),
+        "status": "success",
+        "pdf_id": existing_pdf.pdf_id,
+        "duplicate": True
+    }
+
+def save_processed_pdf(db: Session, filename: str, result: Dict[str, Any], content_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Save a successful process_pdf result to the database
+    
+    Returns:
+        Upload result dictionary with status "success", or "success_no_db"
+        if the database save failed
+    """
+    response = {
+        "filename": filename,
+        "extracted_text": result["extracted_text"],
+        "parsed_questions": result["parsed_questions"],
+        "question_count": result["question_count"],
+        "status": "success",
+        "pdf_id": None,
+        "duplicate": False
+    }
+    
+    try:
+        # Check if PDF already exists
+        existing_pdf = get_pdf_by_name(db, filename)
+        if existing_pdf:
+            logger.warning(f"PDF {filename} already exists with ID: {existing_pdf.pdf_id}")
+            response["pdf_id"] = existing_pdf.pdf_id
+            return response
+        
+        # Save to database
+        pdf_record = create_pdf_from_parsed_data(
+            db=db,
+            pdf_name=filename,
+            parsed_questions=result["parsed_questions"],
+            content_sha256=content_sha256
+        )
+        
+        logger.info(f"Successfully processed and saved PDF: {filename} with ID: {pdf_record.pdf_id}")
+        response["pdf_id"] = pdf_record.pdf_id
+    
+    except Exception as db_error:
+        # A concurrent upload of the same content may have been saved first
+        if content_sha256:
+            try:
+                existing_pdf = get_pdf_by_hash(db, content_sha256)
+                if existing_pdf:
+                    response["pdf_id"] = existing_pdf.pdf_id
+                    response["duplicate"] = True
+                    return response
+            except Exception:
+                pass
+        
+        logger.error(f"Database error while saving PDF {filename}: {db_error}")
+        # Return success but without database save
+        response["status"] = "success_no_db"
+    
+    return response
+
+async def save_processed_pdf_batched(filename: str, result: Dict[str, Any], content_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Save a successful process_pdf result through the group-commit writer
+    
+    Same result as save_processed_pdf, but the insert shares a transaction
+    with other uploads saved at about the same time.
+    """
+    response = {
+        "filename": filename,
+        "extracted_text": result["extracted_text"],
+        "parsed_questions": result["parsed_questions"],
+        "question_count": result["question_count"],
+        "status": "success",
+        "pdf_id": None,
+        "duplicate": False
+    }
+    
+    try:
+        pdf_id, outcome = await write_batcher.submit(filename, result["parsed_questions"], content_sha256)
+        response["pdf_id"] = pdf_id
+        if outcome == SAME_NAME:
+            logger.warning(f"PDF {filename} already exists with ID: {pdf_id}")
+        elif outcome == SAME_CONTENT:
+            response["duplicate"] = True
+        else:
+            logger.info(f"Successfully processed and saved PDF: {filename} with ID: {pdf_id}")
+    
+    except Exception as db_error:
+        logger.error(f"Database error while saving PDF {filename}: {db_error}")
+        # Return success but without database save
+        response["status"] = "success_no_db"
+    
+    return response
+
+async def run_db_step(db_lock: Optional[asyncio.Lock], func, *args):
+    """
+    Run a blocking database step on the database executor
+    
+    When several uploads share one session, db_lock makes sure only one
+    of them uses it at a time.
+    """
+    if db_lock is None:
+        return await run_db(func, *args)
+    async with db_lock:
+        return await run_db(func, *args)
+
+async def ingest_pdf(
+    db: Session,
+    filename: str,
+    pdf_data: bytes,
+    content_sha256: Optional[str] = None,
+    db_lock: Optional[asyncio.Lock] = None
+) -> Dict[str, Any]:
+    """
+    Run the full upload pipeline for one PDF
+    
+    Database steps run on the database executor so they don't block the event loop,
+    and extraction runs in the extraction pool, so concurrent calls overlap
+    one file's database write with other files' extraction.
+    
+    Args:
+        db: Database session
+        filename: Name of the uploaded file
+        pdf_data: Raw PDF bytes
+        content_sha256: Hex SHA-256 of pdf_data
+        db_lock: Lock to hold while using db, if it is shared between calls
+    
+    Returns:
+        Upload result dictionary; on failure {"filename", "status": "error", "error"}
+    """
+    # Identical content was already processed, no need to extract again
+    if content_sha256:
+        duplicate = await run_db_step(db_lock, find_duplicate_upload, db, filename, content_sha256)
+        if duplicate:
+            return duplicate
+    
+    # Process PDF straight from the upload buffer
+    result = await extract_pdf(pdf_data, content_sha256, filename)
+    
+    if not result["success"]:
+        return {
+            "filename": filename,
+            "status": "error",
+            "error": result["error"]
+        }
+    
+    if settings.WRITE_BATCH_ENABLED:
+        response = await save_processed_pdf_batched(filename, result, content_sha256)
+    else:
+        response = await run_db_step(db_lock, save_processed_pdf, db, filename, result, content_sha256)
+
+    # Encode the new tree in the background, so the first read of it is
+    # served from the cache without delaying this response
+    if response["pdf_id"] and not response["duplicate"] and settings.RESPONSE_CACHE_WARM_ON_INGEST and response_cache.enabled:
+        schedule_cache_warm(response["pdf_id"])
+    return response
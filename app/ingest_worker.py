@@ -0,0 +1,171 @@
+"""
+Durable ingest workers for GradeMate application
+
+Workers claim rows from the ingest_jobs table with SELECT ... FOR UPDATE
+SKIP LOCKED, keep their lease alive with a heartbeat while the PDF is
+processed, and record the result. A job whose worker dies is retried once
+its lease expires, so any number of nodes can drain a shared backlog.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .crud import (
+    create_ingest_jobs, get_ingest_jobs, count_queued_ingest_jobs,
+    claim_ingest_job, extend_ingest_job_lease, finish_ingest_job, release_ingest_job
+)
+from .database import get_db_session, run_db, with_db_session
+from .ingest import ingest_pdf
+from .jobs import QueueFullError, summarize_job
+
+logger = logging.getLogger(__name__)
+
+# -------- Queue access for the API --------
+def enqueue_ingest_job(files: List[Dict[str, Any]]) -> str:
+    """
+    Store the files of one upload request in the ingest_jobs table
+    
+    Raises:
+        QueueFullError: If the shared backlog has no room for the files
+    
+    Returns:
+        The job ID to poll
+    """
+    pending = len([f for f in files if "error" not in f])
+    if with_db_session(count_queued_ingest_jobs) + pending > settings.JOB_QUEUE_MAX_FILES:
+        raise QueueFullError("Upload queue is full, please retry later")
+    
+    job_id = uuid.uuid4().hex
+    with_db_session(create_ingest_jobs, job_id, files)
+    return job_id
+
+def get_ingest_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Get the job status response for a stored job, or None if unknown"""
+    rows = with_db_session(get_ingest_jobs, job_id)
+    if not rows:
+        return None
+    
+    files = []
+    for row in rows:
+        if row.result:
+            files.append(json.loads(row.result))
+        else:
+            files.append({"filename": row.filename, "status": row.status})
+    return summarize_job(job_id, files)
+
+# -------- Workers --------
+class IngestWorker:
+    """Claims and processes ingest jobs one at a time"""
+    
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id[:64]
+    
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                job = await run_db(with_db_session, self._claim)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} could not claim a job: {e}")
+                job = None
+            
+            if job is None:
+                # Nothing to do: wait for the next poll (or shutdown)
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=settings.INGEST_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            await self._process(job)
+    
+    def _claim(self, db: Session) -> Optional[Dict[str, Any]]:
+        """Claim a job and copy what's needed out of the session"""
+        job = claim_ingest_job(db, self.worker_id, settings.INGEST_LEASE_SECONDS, settings.INGEST_MAX_ATTEMPTS)
+        if job is None:
+            return None
+        return {
+            "ingest_job_id": job.ingest_job_id,
+            "job_id": job.job_id,
+            "filename": job.filename,
+            "content_sha256": job.content_sha256,
+            "pdf_data": job.pdf_data
+        }
+    
+    async def _heartbeat(self, ingest_job_id: int) -> None:
+        """Extend the lease periodically while the job is processed"""
+        interval = settings.INGEST_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                owned = await run_db(
+                    with_db_session, extend_ingest_job_lease, ingest_job_id, self.worker_id, settings.INGEST_LEASE_SECONDS
+                )
+                if not owned:
+                    logger.warning(f"Worker {self.worker_id} lost the lease on ingest job {ingest_job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat failed for ingest job {ingest_job_id}: {e}")
+    
+    async def _process(self, job: Dict[str, Any]) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job["ingest_job_id"]))
+        db = get_db_session()
+        try:
+            result = await ingest_pdf(db, job["filename"], job["pdf_data"], job["content_sha256"])
+        except Exception as e:
+            result = None
+            logger.error(f"Worker {self.worker_id} failed on ingest job {job['job_id']} ({job['filename']}): {e}")
+        finally:
+            heartbeat.cancel()
+            db.close()
+        
+        try:
+            if result is None:
+                # Unexpected error: put the job back for another attempt
+                await run_db(with_db_session, release_ingest_job, job["ingest_job_id"], self.worker_id)
+                return
+            
+            owned = await run_db(with_db_session, finish_ingest_job, job["ingest_job_id"], self.worker_id, result)
+            if not owned:
+                # Another worker took over; content-hash dedup keeps the PDF from being stored twice
+                logger.warning(f"Worker {self.worker_id} finished ingest job {job['ingest_job_id']} after losing its lease")
+        except Exception as e:
+            # The lease will expire and the job will be retried
+            logger.error(f"Worker {self.worker_id} could not record ingest job {job['ingest_job_id']}: {e}")
+
+class IngestWorkerPool:
+    """Runs a number of IngestWorkers on the current event loop"""
+    
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._stop = asyncio.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(IngestWorker(f"{prefix}:{i}").run(self._stop))
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} ingest workers")
+    
+    async def stop(self) -> None:
+        """Let workers finish their current job, then stop"""
+        self._stop.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Ingest workers stopped")
+    
+    async def wait(self) -> None:
+        """Wait until the workers stop"""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
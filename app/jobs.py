@@ -0,0 +1,165 @@
+"""
+Background upload jobs for GradeMate application
+
+Upload endpoints can enqueue files instead of processing them inline. A
+pool of worker tasks drains the queue and records per-file progress, which
+clients poll via GET /upload/jobs/{job_id}.
+
+With JOB_BACKEND=memory the queue lives in this process. With
+JOB_BACKEND=database files are stored in the ingest_jobs table and drained
+by IngestWorkerPool (see ingest_worker.py), on any number of nodes.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+from .database import get_db_session
+from .ingest import ingest_pdf
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    """Raised when the job queue can't take more files"""
+    pass
+
+class JobManagerNotStartedError(Exception):
+    """Raised when a job is created before the workers are started"""
+    pass
+
+def job_status(files: List[Dict[str, Any]]) -> str:
+    """Overall status of a job from its per-file statuses"""
+    statuses = [f["status"] for f in files]
+    if all(s == "queued" for s in statuses):
+        return "queued"
+    if any(s in ("queued", "processing") for s in statuses):
+        return "running"
+    return "completed"
+
+def summarize_job(job_id: str, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the job status response from per-file results"""
+    return {
+        "job_id": job_id,
+        "status": job_status(files),
+        "total_files": len(files),
+        "processed": len([f for f in files if f["status"] not in ("queued", "processing")]),
+        "successful": len([f for f in files if f["status"] == "success"]),
+        "failed": len([f for f in files if f["status"] == "error"]),
+        "files": files
+    }
+
+class UploadJob:
+    """Progress of one upload request and its files"""
+    
+    def __init__(self, filenames: List[str]):
+        self.job_id = uuid.uuid4().hex
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.files: List[Dict[str, Any]] = [
+            {"filename": filename, "status": "queued"} for filename in filenames
+        ]
+    
+    @property
+    def status(self) -> str:
+        return job_status(self.files)
+    
+    def set_result(self, index: int, result: Dict[str, Any]) -> None:
+        self.files[index] = result
+        if self.status == "completed":
+            self.finished_at = time.time()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return summarize_job(self.job_id, self.files)
+
+class JobManager:
+    """In-memory job store with a queue drained by worker tasks"""
+    
+    def __init__(self, workers: int, max_queued_files: int, retention_seconds: float):
+        self.workers = workers
+        self.max_queued_files = max_queued_files
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, UploadJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued_files)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} upload job workers")
+    
+    async def stop(self) -> None:
+        """Cancel the worker tasks; queued files are dropped"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        logger.info("Upload job workers stopped")
+    
+    def create_job(self, files: List[Dict[str, Any]]) -> UploadJob:
+        """
+        Create a job and enqueue its files
+        
+        Args:
+            files: Dictionaries with "filename" and either "pdf_data" and
+                "content_sha256", or "error" for files rejected up front
+        
+        Raises:
+            JobManagerNotStartedError: If the workers are not running
+            QueueFullError: If the queue has no room for all files
+        """
+        if self._queue is None:
+            raise JobManagerNotStartedError("Upload job workers are not running, please retry later")
+        
+        pending = [f for f in files if "error" not in f]
+        if self._queue.qsize() + len(pending) > self.max_queued_files:
+            raise QueueFullError("Upload queue is full, please retry later")
+        
+        self._prune()
+        job = UploadJob([f["filename"] for f in files])
+        self._jobs[job.job_id] = job
+        
+        for index, file in enumerate(files):
+            if "error" in file:
+                job.set_result(index, {"filename": file["filename"], "status": "error", "error": file["error"]})
+            else:
+                self._queue.put_nowait((job, index, file["filename"], file["pdf_data"], file["content_sha256"]))
+        
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[UploadJob]:
+        return self._jobs.get(job_id)
+    
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    async def _worker(self, worker_no: int) -> None:
+        while True:
+            job, index, filename, pdf_data, content_sha256 = await self._queue.get()
+            job.files[index] = {"filename": filename, "status": "processing"}
+            db = get_db_session()
+            try:
+                result = await ingest_pdf(db, filename, pdf_data, content_sha256)
+            except Exception as e:
+                logger.error(f"Upload job {job.job_id} failed for {filename}: {e}")
+                result = {"filename": filename, "status": "error", "error": str(e)}
+            finally:
+                db.close()
+                self._queue.task_done()
+            job.set_result(index, result)
+
+job_manager = JobManager(
+    workers=settings.JOB_WORKERS,
+    max_queued_files=settings.JOB_QUEUE_MAX_FILES,
+    retention_seconds=settings.JOB_RETENTION_SECONDS
+)
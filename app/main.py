@@ -2,7 +2,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import upload, data
 from .config import settings
-from .database import create_tables, test_connection
+from .database import create_tables, get_db_session, test_connection, run_db, shutdown_db_executor
+from .crud import load_pdf_name_index
+from .extraction import get_executor, shutdown_executor
+from .jobs import job_manager
+from .ingest_worker import IngestWorkerPool
+from .write_batcher import write_batcher
+from .purger import purger
 import logging
 
 # Configure logging
@@ -11,6 +17,9 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="GradeMate API", version="1.0.0")
 
+# Workers draining the shared ingest_jobs table (database job backend only)
+ingest_workers = IngestWorkerPool(settings.JOB_WORKERS)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -30,10 +39,36 @@ async def startup_event():
             # Create tables if they don't exist
             create_tables()
             logger.info("Database initialized successfully")
+            
+            # Load PDF names up front so the first type-ahead search doesn't wait for it
+            db = get_db_session()
+            try:
+                await run_db(load_pdf_name_index, db)
+            finally:
+                db.close()
         else:
             logger.error("Failed to connect to database")
     except Exception as e:
         logger.error(f"Error during startup: {e}")
+    
+    # Start extraction workers up front so the first upload doesn't pay for it
+    get_executor()
+    if settings.JOB_BACKEND == "database":
+        ingest_workers.start()
+    else:
+        job_manager.start()
+    if settings.PURGE_ENABLED:
+        purger.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers on shutdown"""
+    await job_manager.stop()
+    await ingest_workers.stop()
+    await write_batcher.stop()
+    await purger.stop()
+    shutdown_executor()
+    shutdown_db_executor()
 
 app.include_router(upload.router)
 app.include_router(data.router)
@@ -46,7 +81,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    db_status = "connected" if test_connection() else "disconnected"
+    db_status = "connected" if await run_db(test_connection) else "disconnected"
     return {
         "status": "healthy",
         "service": "GradeMate API",
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, ForeignKey, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, LargeBinary
+from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,10 +12,26 @@ class PDF(Base):
     
     pdf_id = Column(BigInteger, primary_key=True, autoincrement=True)
     pdf_name = Column(String(255), nullable=False, unique=True)
+    content_sha256 = Column(String(64), nullable=True, unique=True, index=True)  # Hex SHA-256 of the uploaded file
     uploaded_at = Column(DateTime, nullable=False, default=func.current_timestamp())
+    # Denormalized counters for listings, kept in sync by crud on insert/delete
+    question_count = Column(Integer, nullable=False, default=0, server_default="0")
+    answer_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever the PDF's questions/answers change, used for ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime, nullable=False, default=func.current_timestamp())
+    # Set when the PDF is deleted; its rows are then removed by the background purger
+    deleted_at = Column(DateTime, nullable=True, index=True)
     
     # Relationship to questions
-    questions = relationship("Question", back_populates="pdf", cascade="all, delete-orphan")
+    # passive_deletes: deleting a PDF leaves its children to the database's ON DELETE CASCADE
+    questions = relationship("Question", back_populates="pdf", cascade="all, delete-orphan", passive_deletes=True)
+    
+    # Constraints
+    __table_args__ = (
+        # Keyset pagination of listings
+        Index("ix_pdfs_uploaded_at_pdf_id", "uploaded_at", "pdf_id"),
+    )
 
 class Question(Base):
     __tablename__ = "questions"
@@ -26,7 +43,7 @@ class Question(Base):
     
     # Relationships
     pdf = relationship("PDF", back_populates="questions")
-    answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
+    answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
     
     # Constraints
     __table_args__ = (
@@ -51,4 +68,30 @@ class Answer(Base):
         UniqueConstraint("question_id", "part_no", name="uq_part"),
         CheckConstraint("part_no BETWEEN 1 AND 50", name="ck_part_range"),
         CheckConstraint("LOWER(roman_text) REGEXP '^(i|ii|iii|iv|v|vi|vii|viii|ix|x|xi|xii|xiii|xiv|xv|xvi|xvii|xviii|xix|xx)$'", name="ck_roman_format"),
+        # Full-text search of answers (MySQL only)
+        Index("ft_answers_answer_text", "answer_text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+    
+    ingest_job_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), nullable=False, index=True)  # Groups the files of one upload request
+    file_index = Column(Integer, nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_sha256 = Column(String(64), nullable=True)
+    pdf_data = Column(LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=True)  # Cleared once processed
+    status = Column(String(16), nullable=False, default="queued")  # queued, processing, done, failed
+    result = Column(Text, nullable=True)  # JSON upload result once processed
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=func.current_timestamp())
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint("job_id", "file_index", name="uq_ingest_job_file"),
+        Index("ix_ingest_jobs_claim", "status", "lease_expires_at"),
     )
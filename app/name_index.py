@@ -0,0 +1,169 @@
+"""
+In-memory index of PDF names for type-ahead search
+
+Names are matched by prefix, and by trigram similarity so typos and words
+in the middle of a name still match. The index is loaded from the database
+at startup and kept current by crud as PDFs are created and deleted; PDFs
+written by other processes (e.g. worker.py) show up after the next periodic
+reload.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import settings
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Share of a query's trigrams a name must contain to be a fuzzy match
+MIN_SIMILARITY = 0.5
+
+def name_trigrams(text: str) -> Set[str]:
+    """Trigrams of each word of text, padded so word starts weigh more"""
+    text = text.lower()
+    if text.endswith(".pdf"):
+        text = text[:-4]  # Every name has it, so it would match everything
+    grams = set()
+    for word in _WORD.findall(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class PDFNameIndex:
+    """Prefix and trigram index of the names of stored PDFs"""
+    
+    def __init__(self, refresh_seconds: float, min_similarity: float = MIN_SIMILARITY):
+        self.refresh_seconds = refresh_seconds
+        self.min_similarity = min_similarity
+        self.loaded_at: Optional[float] = None
+        self._names: Dict[int, str] = {}
+        self._sorted: List[Tuple[str, int]] = []  # (lowercase name, pdf_id), for prefix lookups
+        self._trigrams: Dict[str, Set[int]] = {}
+        # Changes made while a load is running, replayed on top of its rows
+        self._journal: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._lock = threading.Lock()
+    
+    def needs_load(self) -> bool:
+        """Whether the index was never loaded or is due for a reload"""
+        if self._journal is not None:
+            return False
+        if self.loaded_at is None:
+            return True
+        return self.refresh_seconds > 0 and time.monotonic() - self.loaded_at > self.refresh_seconds
+    
+    def begin_load(self) -> bool:
+        """Start recording changes for a load; False if another load is running"""
+        with self._lock:
+            if self._journal is not None:
+                return False
+            self._journal = []
+            return True
+    
+    def finish_load(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Replace the index with (pdf_id, pdf_name) rows read after begin_load"""
+        names = dict(rows)
+        with self._lock:
+            for pdf_id, pdf_name in self._journal or ():
+                if pdf_name is None:
+                    names.pop(pdf_id, None)
+                else:
+                    names[pdf_id] = pdf_name
+            self._journal = None
+            self._names = {}
+            self._sorted = []
+            self._trigrams = {}
+            for pdf_id, pdf_name in names.items():
+                self._add(pdf_id, pdf_name, keep_sorted=False)
+            self._sorted.sort()
+            self.loaded_at = time.monotonic()
+    
+    def abort_load(self) -> None:
+        with self._lock:
+            self._journal = None
+    
+    def add(self, pdf_id: int, pdf_name: str) -> None:
+        """Index a newly created PDF"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((pdf_id, pdf_name))
+            self._remove(pdf_id)
+            self._add(pdf_id, pdf_name)
+    
+    def remove(self, pdf_id: int) -> None:
+        """Drop a deleted PDF"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((pdf_id, None))
+            self._remove(pdf_id)
+    
+    def _add(self, pdf_id: int, pdf_name: str, keep_sorted: bool = True) -> None:
+        self._names[pdf_id] = pdf_name
+        if keep_sorted:
+            insort(self._sorted, (pdf_name.lower(), pdf_id))
+        else:
+            self._sorted.append((pdf_name.lower(), pdf_id))
+        for gram in name_trigrams(pdf_name):
+            self._trigrams.setdefault(gram, set()).add(pdf_id)
+    
+    def _remove(self, pdf_id: int) -> None:
+        pdf_name = self._names.pop(pdf_id, None)
+        if pdf_name is None:
+            return
+        position = bisect_left(self._sorted, (pdf_name.lower(), pdf_id))
+        if position < len(self._sorted) and self._sorted[position][1] == pdf_id:
+            del self._sorted[position]
+        for gram in name_trigrams(pdf_name):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(pdf_id)
+                if not ids:
+                    del self._trigrams[gram]
+    
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find PDF names matching query, best first
+        
+        Names starting with the query come first (score 1.0), then names
+        sharing at least min_similarity of the query's trigrams, scored by
+        that share.
+        """
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+        
+        with self._lock:
+            matches = []
+            position = bisect_left(self._sorted, (prefix,))
+            while position < len(self._sorted) and len(matches) < limit:
+                name, pdf_id = self._sorted[position]
+                if not name.startswith(prefix):
+                    break
+                matches.append({"pdf_id": pdf_id, "pdf_name": self._names[pdf_id], "score": 1.0, "match": "prefix"})
+                position += 1
+            if len(matches) >= limit:
+                return matches
+            
+            grams = name_trigrams(prefix)
+            if not grams:
+                return matches
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._trigrams.get(gram, ()))
+            found = {match["pdf_id"] for match in matches}
+            fuzzy = [
+                (count / len(grams), pdf_id) for pdf_id, count in shared.items()
+                if pdf_id not in found and count / len(grams) >= self.min_similarity
+            ]
+            fuzzy.sort(key=lambda hit: (-hit[0], len(self._names[hit[1]]), self._names[hit[1]]))
+            for score, pdf_id in fuzzy[:limit - len(matches)]:
+                matches.append({"pdf_id": pdf_id, "pdf_name": self._names[pdf_id], "score": score, "match": "fuzzy"})
+            return matches
+    
+    def __len__(self) -> int:
+        return len(self._names)
+
+pdf_name_index = PDFNameIndex(refresh_seconds=settings.PDF_NAME_INDEX_REFRESH_SECONDS)
@@ -1,90 +1,140 @@
 import fitz  # PyMuPDF
+import itertools
+import os
 import re
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, Iterator, Tuple, Union
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# A PDF can be given as a path, raw bytes, or a binary file-like object
+PDFSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+# (start, end) offsets of an answer's text in the source buffer
+AnswerSpan = Tuple[int, int]
+
+# Bump these when extract_text_from_pdf / parse_questions_from_text output
+# changes, so cached results from older versions are not reused
+EXTRACTOR_VERSION = 1
+PARSER_VERSION = 1
+
+# Either header at the start of a line of a whole buffer. Group 1 is the
+# question number, group 2 the part numeral; a part's text starts at match.end().
+_HEADER_PATTERN = r'[^\S\n]*(?:(\d+)\.[^\S\n]*$|([ivxlcdm]+)\.)'
+_FIRST_HEADER_RE = re.compile(r'\A' + _HEADER_PATTERN, re.MULTILINE | re.IGNORECASE)
+# Anchoring on a literal newline (rather than ^) lets the regex engine skip
+# straight to candidate lines, which is several times faster on large texts
+_HEADER_RE = re.compile(r'\n' + _HEADER_PATTERN, re.MULTILINE | re.IGNORECASE)
+
+def open_pdf(source: PDFSource) -> fitz.Document:
+    """
+    Open a PDF from a path, an in-memory buffer or a file-like object
     """
-    Extract text from PDF file using PyMuPDF
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    if isinstance(source, memoryview):
+        # Older PyMuPDF releases only accept bytes/bytearray streams
+        source = source.tobytes()
+    elif hasattr(source, "read"):
+        source.seek(0)
+        source = source.read()
+    return fitz.open(stream=source, filetype="pdf")
+
+def iter_pdf_pages(source: PDFSource) -> Iterator[str]:
+    """
+    Yield the text of each PDF page lazily, one page at a time
     """
     try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text += page.get_text()
-            if page_num < len(doc) - 1:  # Add newline between pages
-                text += "\n"
-        
-        doc.close()
-        return text
+        doc = open_pdf(source)
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
+    
+    try:
+        for page_num in range(len(doc)):
+            try:
+                page_text = doc[page_num].get_text()
+            except Exception as e:
+                raise Exception(f"Error extracting text from PDF: {str(e)}")
+            yield page_text
+    finally:
+        doc.close()
 
-def parse_questions_from_text(text: str) -> Dict[str, Dict[str, str]]:
+def extract_text_from_pdf(source: PDFSource) -> str:
     """
-    Parse questions and answers from extracted text
-    Expected format:
-    1.
-    i. Answer text for part i
-    ii. Answer text for part ii
-    2.
-    i. Answer text for question 2 part i
+    Extract text from a PDF using PyMuPDF
+    
+    The PDF can be a file path, bytes/memoryview, or a file-like object,
+    so uploads can be processed without writing them to disk first.
+    """
+    # Pages are separated by a newline
+    return "\n".join(iter_pdf_pages(source))
+
+def scan_question_spans(text: str) -> Dict[str, Dict[str, AnswerSpan]]:
+    """
+    Locate every question and answer in a single pass over the text
+    
+    Returns the same structure as parse_questions_from_text, but with each
+    answer given as a (start, end) span into text instead of a copied string.
+    Use answer_text to materialise an answer when it is needed.
     """
-    lines = text.split('\n')
     questions = {}
-    current_question = None
+    current_answers = None
     current_part = None
-    current_text = []
+    part_start = 0
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Check for question number (e.g., "1.", "2.", etc.)
-        question_match = re.match(r'^(\d+)\.\s*$', line)
-        if question_match:
-            # Save previous question if exists
-            if current_question and current_part:
-                questions[current_question][current_part] = '\n'.join(current_text).strip()
-            
-            # Start new question
-            current_question = question_match.group(1)
-            questions[current_question] = {}
+    matches = _HEADER_RE.finditer(text)
+    first_match = _FIRST_HEADER_RE.match(text)
+    if first_match:
+        matches = itertools.chain((first_match,), matches)
+    
+    for match in matches:
+        # A header ends the previous part
+        if current_part is not None:
+            current_answers[current_part] = (part_start, match.start())
             current_part = None
-            current_text = []
-            continue
-        
-        # Check for part (e.g., "i.", "ii.", "iii.", etc.)
-        part_match = re.match(r'^([ivxlcdm]+)\.\s*(.*)$', line, re.IGNORECASE)
-        if part_match:
-            # Save previous part if exists
-            if current_question and current_part:
-                questions[current_question][current_part] = '\n'.join(current_text).strip()
-            
-            # Start new part
-            current_part = part_match.group(1).lower()
-            current_text = [part_match.group(2)] if part_match.group(2).strip() else []
-            continue
         
-        # Regular text line - add to current part
-        if current_question and current_part is not None:
-            current_text.append(line)
+        question_no, part = match.groups()
+        if question_no is not None:
+            # A repeated question number starts the question over
+            current_answers = questions[question_no] = {}
+        elif current_answers is not None:
+            current_part = part.lower()
+            part_start = match.end()
     
-    # Save last part
-    if current_question and current_part:
-        questions[current_question][current_part] = '\n'.join(current_text).strip()
+    # Close the last part
+    if current_part is not None:
+        current_answers[current_part] = (part_start, len(text))
     
     return questions
 
-def process_pdf(pdf_path: str) -> Dict[str, Any]:
+def answer_text(text: str, span: AnswerSpan) -> str:
+    """
+    Materialise an answer span: non-blank lines, stripped and newline-joined
+    """
+    chunk = text[span[0]:span[1]]
+    if '\n' not in chunk:
+        return chunk.strip()
+    return '\n'.join([line for line in map(str.strip, chunk.split('\n')) if line])
+
+def parse_questions_from_text(text: str) -> Dict[str, Dict[str, str]]:
+    """
+    Parse questions and answers from extracted text
+    Expected format:
+    1.
+    i. Answer text for part i
+    ii. Answer text for part ii
+    2.
+    i. Answer text for question 2 part i
+    """
+    return {
+        main_no: {part: answer_text(text, span) for part, span in parts.items()}
+        for main_no, parts in scan_question_spans(text).items()
+    }
+
+def process_pdf(source: PDFSource) -> Dict[str, Any]:
     """
     Main function to process PDF and extract questions/answers
     """
     try:
         # Extract text from PDF
-        extracted_text = extract_text_from_pdf(pdf_path)
+        extracted_text = extract_text_from_pdf(source)
         
         # Parse questions and answers
         parsed_questions = parse_questions_from_text(extracted_text)
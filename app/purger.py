@@ -0,0 +1,93 @@
+"""
+Background purger for deleted PDFs
+
+Deleting a PDF only marks it deleted. The purger then removes its answers,
+questions and finally the PDF row in small chunks, one short transaction at
+a time with a pause in between, so a large removal never holds many row
+locks or competes with other users' writes for long.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from .config import settings
+from .crud import get_deleted_pdf_ids, purge_deleted_pdf_chunk
+from .database import run_db, with_db_session
+
+logger = logging.getLogger(__name__)
+
+class Purger:
+    """Removes the rows of deleted PDFs chunk by chunk"""
+    
+    def __init__(self, chunk_size: int, chunk_delay_seconds: float, idle_seconds: float):
+        self.chunk_size = chunk_size
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.idle_seconds = idle_seconds
+        self.rows_purged = 0
+        self.pdfs_purged = 0
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start purging on the running event loop"""
+        if self._task is not None:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Started deleted PDF purger")
+    
+    async def stop(self) -> None:
+        """Stop after the current chunk"""
+        if self._task is None:
+            return
+        self._stop.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("Deleted PDF purger stopped")
+    
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep, waking up early if stopped"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                pdf_ids = await run_db(with_db_session, get_deleted_pdf_ids)
+            except Exception as e:
+                logger.error(f"Purger could not list deleted PDFs: {e}")
+                pdf_ids = []
+            
+            if not pdf_ids:
+                await self._sleep(self.idle_seconds)
+                continue
+            
+            for pdf_id in pdf_ids:
+                await self._purge(pdf_id)
+                if self._stop.is_set():
+                    return
+    
+    async def _purge(self, pdf_id: int) -> None:
+        """Remove one deleted PDF, pausing between chunks"""
+        while not self._stop.is_set():
+            try:
+                removed = await run_db(with_db_session, purge_deleted_pdf_chunk, pdf_id, self.chunk_size)
+            except Exception:
+                # Already logged; try again on the next round
+                await self._sleep(self.idle_seconds)
+                return
+            if not removed:
+                self.pdfs_purged += 1
+                logger.info(f"Purged deleted PDF {pdf_id}")
+                return
+            self.rows_purged += removed
+            await self._sleep(self.chunk_delay_seconds)
+
+purger = Purger(
+    chunk_size=settings.PURGE_CHUNK_SIZE,
+    chunk_delay_seconds=settings.PURGE_CHUNK_DELAY_SECONDS,
+    idle_seconds=settings.PURGE_IDLE_SECONDS
+)
@@ -0,0 +1,138 @@
+"""
+In-process cache of serialized /data responses
+
+Stored sheets only change when something is deleted, so the JSON of a PDF,
+question or answer lookup is kept in memory and served without touching the
+database. Entries expire after a TTL, the least recently used are evicted
+beyond the memory budget, and every entry is tagged with the PDF it belongs
+to so deleting anything in a sheet drops all of the sheet's cached responses.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+from .config import settings
+
+# Approximate per-entry bookkeeping cost counted against the memory budget
+_ENTRY_OVERHEAD = 200
+
+def pdf_tag(pdf_id: int) -> str:
+    """Tag of every cached response that includes data of a PDF"""
+    return f"pdf:{pdf_id}"
+
+class ResponseCache:
+    """Memory-bounded TTL + LRU cache of response bodies"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (body, expires_at, tags)
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._size = 0
+        # Bumped by every invalidation, so a response loaded before a delete
+        # committed is not cached after the delete invalidated its tag
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Get a cached body, or None if it is missing or expired"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, body: bytes, tags: Iterable[str] = (), generation: Optional[int] = None) -> None:
+        """
+        Cache a body under key, dropping least recently used entries if over budget
+
+        Pass the generation read before loading the data: if anything was
+        invalidated since, the body may be stale and is not cached.
+        """
+        if not self.enabled:
+            return
+        size = len(body) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            tags = tuple(tags)
+            self._entries[key] = (body, time.monotonic() + self.ttl_seconds, tags)
+            self._size += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, tag: str) -> None:
+        """Drop every entry carrying tag"""
+        with self._lock:
+            self.generation += 1
+            keys = self._tags.pop(tag, ())
+            for key in list(keys):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        body, _, tags = self._entries.pop(key)
+        self._size -= len(body) + _ENTRY_OVERHEAD
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes
+            }
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
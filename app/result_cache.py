@@ -0,0 +1,206 @@
+"""
+Disk-backed cache of PDF extraction and parse results
+
+Results are stored in a local SQLite file keyed by the SHA-256 of the PDF
+bytes and the extractor/parser versions. Extracted text and parsed questions
+are cached separately, so when only the parser changes the cached text is
+re-parsed without opening the PDF again.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .pdf_extractor import EXTRACTOR_VERSION, PARSER_VERSION, parse_questions_from_text
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extracted_texts (
+    sha256 TEXT NOT NULL,
+    extractor_version INTEGER NOT NULL,
+    extracted_text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (sha256, extractor_version)
+);
+CREATE TABLE IF NOT EXISTS parsed_questions (
+    sha256 TEXT NOT NULL,
+    extractor_version INTEGER NOT NULL,
+    parser_version INTEGER NOT NULL,
+    parsed_json TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (sha256, extractor_version, parser_version)
+);
+CREATE INDEX IF NOT EXISTS ix_extracted_texts_last_access ON extracted_texts (last_access);
+"""
+
+class ResultCache:
+    """Size-bounded LRU cache of process_pdf results on local disk"""
+    
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.reparses = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets several server processes share the cache file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+    
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached result for the given PDF content hash
+        
+        Returns:
+            A successful process_pdf-shaped result, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            text_row = self._conn.execute(
+                "SELECT extracted_text FROM extracted_texts WHERE sha256 = ? AND extractor_version = ?",
+                (sha256, EXTRACTOR_VERSION)
+            ).fetchone()
+            if text_row is None:
+                self.misses += 1
+                return None
+            
+            parsed_row = self._conn.execute(
+                "SELECT parsed_json FROM parsed_questions "
+                "WHERE sha256 = ? AND extractor_version = ? AND parser_version = ?",
+                (sha256, EXTRACTOR_VERSION, PARSER_VERSION)
+            ).fetchone()
+            self._conn.execute(
+                "UPDATE extracted_texts SET last_access = ? WHERE sha256 = ? AND extractor_version = ?",
+                (now, sha256, EXTRACTOR_VERSION)
+            )
+            if parsed_row is not None:
+                self.hits += 1
+                self._conn.execute(
+                    "UPDATE parsed_questions SET last_access = ? "
+                    "WHERE sha256 = ? AND extractor_version = ? AND parser_version = ?",
+                    (now, sha256, EXTRACTOR_VERSION, PARSER_VERSION)
+                )
+        
+        extracted_text = text_row[0]
+        if parsed_row is not None:
+            parsed_questions = json.loads(parsed_row[0])
+        else:
+            # Only the parser changed: re-parse the cached text
+            parsed_questions = parse_questions_from_text(extracted_text)
+            with self._lock:
+                self.reparses += 1
+                self._put_parsed(sha256, parsed_questions, now)
+                self._evict()
+        
+        return {
+            "success": True,
+            "extracted_text": extracted_text,
+            "parsed_questions": parsed_questions,
+            "question_count": len(parsed_questions)
+        }
+    
+    def put(self, sha256: str, result: Dict[str, Any]) -> None:
+        """Store a successful process_pdf result"""
+        if not result.get("success"):
+            return
+        now = time.time()
+        extracted_text = result["extracted_text"]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extracted_texts VALUES (?, ?, ?, ?, ?)",
+                (sha256, EXTRACTOR_VERSION, extracted_text, len(extracted_text.encode("utf-8")), now)
+            )
+            self._put_parsed(sha256, result["parsed_questions"], now)
+            self._evict()
+    
+    def _put_parsed(self, sha256: str, parsed_questions: dict, now: float) -> None:
+        parsed_json = json.dumps(parsed_questions, ensure_ascii=False)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO parsed_questions VALUES (?, ?, ?, ?, ?, ?)",
+            (sha256, EXTRACTOR_VERSION, PARSER_VERSION, parsed_json, len(parsed_json.encode("utf-8")), now)
+        )
+    
+    def _total_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM extracted_texts)"
+            " + (SELECT COALESCE(SUM(size), 0) FROM parsed_questions)"
+        ).fetchone()[0]
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits its size budget"""
+        total = self._total_bytes()
+        while total > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT sha256, extractor_version, size FROM extracted_texts ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not oldest:
+                # Only parse results without their text are left
+                self._conn.execute("DELETE FROM parsed_questions")
+                break
+            for sha256, extractor_version, size in oldest:
+                # Parse results are evicted together with their text
+                parsed_size = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM parsed_questions WHERE sha256 = ? AND extractor_version = ?",
+                    (sha256, extractor_version)
+                ).fetchone()[0]
+                self._conn.execute(
+                    "DELETE FROM parsed_questions WHERE sha256 = ? AND extractor_version = ?",
+                    (sha256, extractor_version)
+                )
+                self._conn.execute(
+                    "DELETE FROM extracted_texts WHERE sha256 = ? AND extractor_version = ?",
+                    (sha256, extractor_version)
+                )
+                self.evictions += 1
+                total -= size + parsed_size
+                if total <= self.max_bytes:
+                    break
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM extracted_texts").fetchone()[0]
+            total = self._total_bytes()
+        lookups = self.hits + self.reparses + self.misses
+        return {
+            "hits": self.hits,
+            "reparses": self.reparses,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.reparses) / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes
+        }
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+_cache: Optional[ResultCache] = None
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the result cache, or None if caching is disabled or unavailable"""
+    global _cache
+    if _cache is None and settings.RESULT_CACHE_ENABLED:
+        try:
+            _cache = ResultCache(settings.RESULT_CACHE_PATH, settings.RESULT_CACHE_MAX_BYTES)
+        except Exception as e:
+            logger.error(f"Could not open result cache at {settings.RESULT_CACHE_PATH}: {e}")
+            return None
+    return _cache
@@ -2,53 +2,233 @@
 Data retrieval endpoints for GradeMate application
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..database import get_db
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional
+from ..database import get_db, get_db_session, run_db
+from ..response_cache import response_cache, pdf_tag
+from ..name_index import pdf_name_index
+from ..serializers import dumps_json, pdf_to_dict, question_to_dict, answer_to_dict
 from ..crud import (
-    get_pdfs, get_pdf, get_pdf_by_name, delete_pdf,
-    get_questions_by_pdf, get_question, delete_question,
-    get_answers_by_question, get_answer, delete_answer
+    get_pdfs, get_pdf_summaries, get_pdf, get_pdfs_by_ids, get_pdf_by_name, delete_pdf, delete_pdfs,
+    count_pdfs, decode_pdf_cursor, split_pdf_page, PDFPageKey,
+    get_pdf_version, get_pdf_versions, get_question_version, get_answer_version,
+    get_questions_by_pdf, get_question, get_questions_by_ids, delete_question,
+    get_answers_by_question, get_answer, get_answers_by_ids, delete_answer, search_answers,
+    SearchUnsupportedError, load_pdf_name_index, iter_answer_export_rows
 )
 from ..schemas import (
-    PDF, PDFListResponse, Question, QuestionListResponse,
-    Answer, AnswerListResponse, HealthResponse
+    PDF, PDFListResponse, PDFSummaryListResponse, PDFBatchDeleteRequest, PDFBatchDeleteResponse,
+    PDFBatchGetRequest, PDFBatchGetResponse,
+    Question, QuestionListResponse, QuestionBatchResponse,
+    Answer, AnswerListResponse, AnswerBatchResponse, AnswerSearchResponse, PDFNameSearchResponse, HealthResponse
 )
+import csv
+import hashlib
+import io
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/data", tags=["data"])
 
+async def cached_lookup(key, load) -> Optional[Response]:
+    """
+    Serve a lookup response from the response cache, loading it on a miss
+    
+    Args:
+        key: Cache key of the response
+        load: Blocking function returning (response dict, pdf_id), or None if
+            not found; it runs, with the encoding, on the database executor
+    
+    Returns:
+        JSON response, or None if load found nothing
+    """
+    def load_body():
+        loaded = load()
+        if loaded is None:
+            return None
+        data, pdf_id = loaded
+        return dumps_json(data), pdf_id
+    
+    body = response_cache.get(key)
+    if body is None:
+        generation = response_cache.generation
+        loaded = await run_db(load_body)
+        if loaded is None:
+            return None
+        body, pdf_id = loaded
+        response_cache.put(key, body, tags=[pdf_tag(pdf_id)], generation=generation)
+    return Response(content=body, media_type="application/json")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+async def versioned_lookup(kind: str, item_id: int, version: Optional[int], if_none_match: Optional[str], load) -> Optional[Response]:
+    """
+    Serve a lookup with an ETag made from the version of its PDF
+    
+    Returns 304 if the client's copy is current, without loading anything.
+    The version is part of the cache key, so cached responses of an older
+    version are never served, even if another server made the change.
+    
+    Returns:
+        Response, or None if the item doesn't exist
+    """
+    if version is None:
+        return None
+    etag = f'"{kind}-{item_id}-v{version}"'
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    response = await cached_lookup((kind, item_id, version), load)
+    if response is not None:
+        response.headers["ETag"] = etag
+    return response
+
+def listing_etag(kind: str, rows: Iterable[Any], total: int) -> str:
+    """ETag of a listing page, from the (pdf_id, version) of its rows and the total"""
+    digest = hashlib.sha256(str(total).encode("ascii"))
+    for row in rows:
+        digest.update(f";{row.pdf_id}:{row.version}".encode("ascii"))
+    return f'"{kind}-{digest.hexdigest()[:32]}"'
+
+# Most IDs accepted by one batch fetch of questions or answers
+MAX_BATCH_IDS = 1000
+
+def parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated ids query parameter, rejecting malformed ones with 400"""
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No ids provided")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+def batch_body(key: str, ids: List[int], items: Iterable[Any], item_id: Callable[[Any], int], to_dict) -> bytes:
+    """
+    Encode a batch fetch: items in the order of ids (null where missing),
+    then the IDs that were not found
+    """
+    found = {item_id(item): to_dict(item) for item in items}
+    return dumps_json({
+        key: [found.get(requested) for requested in ids],
+        "not_found": [requested for requested in dict.fromkeys(ids) if requested not in found]
+    })
+
 # -------- PDF Endpoints --------
+def parse_cursor(cursor: Optional[str]) -> Optional[PDFPageKey]:
+    """Decode the cursor query parameter, rejecting malformed ones with 400"""
+    if cursor is None:
+        return None
+    try:
+        return decode_pdf_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/pdfs", response_model=PDFListResponse)
 async def get_all_pdfs(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get all PDFs with pagination"""
+    """
+    Get all PDFs with pagination
+    
+    PDFs are ordered by upload time. Follow next_cursor rather than
+    increasing skip: it stays fast however deep the page is.
+    """
+    after = parse_cursor(cursor)
+        
+    def check_etag():
+        return listing_etag("pdfs", get_pdf_versions(db, skip=skip, limit=limit + 1, after=after), count_pdfs(db))
+    
+    def load_page():
+        # One extra row tells whether there is a next page
+        rows = get_pdfs(db, skip=skip, limit=limit + 1, after=after)
+        total = count_pdfs(db)
+        pdfs, next_cursor = split_pdf_page(rows, limit)
+        body = dumps_json({
+            "pdfs": [pdf_to_dict(pdf) for pdf in pdfs],
+            "total": total,
+            "next_cursor": next_cursor
+        })
+        return body, listing_etag("pdfs", rows, total)
+    
     try:
-        pdfs = get_pdfs(db, skip=skip, limit=limit)
-        total = len(pdfs)  # This is a simplified count, in production you'd want a proper count query
+        # Check the client's copy against the page's versions before loading trees
+        if if_none_match:
+            etag = await run_db(check_etag)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
         
-        return PDFListResponse(pdfs=pdfs, total=total)
+        body, etag = await run_db(load_page)
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
     except Exception as e:
         logger.error(f"Error retrieving PDFs: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving PDFs")
 
+@router.get("/pdfs/summary", response_model=PDFSummaryListResponse)
+async def get_pdf_summary_list(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get PDFs with their question/answer counts, without questions and answers"""
+    after = parse_cursor(cursor)
+    
+    def load_rows():
+        return get_pdf_summaries(db, skip=skip, limit=limit + 1, after=after), count_pdfs(db)
+    
+    try:
+        rows, total = await run_db(load_rows)
+        etag = listing_etag("pdf-summaries", rows, total)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        pdfs, next_cursor = split_pdf_page(rows, limit)
+        content = PDFSummaryListResponse(pdfs=pdfs, total=total, next_cursor=next_cursor).model_dump_json()
+        return Response(content=content, media_type="application/json", headers={"ETag": etag})
+    except Exception as e:
+        logger.error(f"Error retrieving PDF summaries: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving PDFs")
+
 @router.get("/pdfs/{pdf_id}", response_model=PDF)
 async def get_pdf_by_id(
     pdf_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """Get a specific PDF by ID with all questions and answers"""
-    try:
+    def load():
         pdf = get_pdf(db, pdf_id)
-        if not pdf:
+        return (pdf_to_dict(pdf), pdf.pdf_id) if pdf else None
+    
+    try:
+        version = await run_db(get_pdf_version, db, pdf_id)
+        response = await versioned_lookup("pdf", pdf_id, version, if_none_match, load)
+        if response is None:
             raise HTTPException(status_code=404, detail="PDF not found")
-        return pdf
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -62,7 +242,7 @@ async def delete_pdf_by_id(
 ):
     """Delete a PDF and all its questions/answers"""
     try:
-        success = delete_pdf(db, pdf_id)
+        success = await run_db(delete_pdf, db, pdf_id)
         if not success:
             raise HTTPException(status_code=404, detail="PDF not found")
         return {"message": f"PDF {pdf_id} deleted successfully"}
@@ -72,7 +252,66 @@ async def delete_pdf_by_id(
         logger.error(f"Error deleting PDF {pdf_id}: {e}")
         raise HTTPException(status_code=500, detail="Error deleting PDF")
 
+@router.post("/pdfs:batchDelete", response_model=PDFBatchDeleteResponse)
+async def batch_delete_pdfs(
+    request: PDFBatchDeleteRequest,
+    db: Session = Depends(get_db)
+):
+    """Delete several PDFs and all their questions/answers in one statement"""
+    try:
+        deleted = set(await run_db(delete_pdfs, db, request.pdf_ids))
+        return PDFBatchDeleteResponse(
+            deleted=[pdf_id for pdf_id in dict.fromkeys(request.pdf_ids) if pdf_id in deleted],
+            not_found=[pdf_id for pdf_id in dict.fromkeys(request.pdf_ids) if pdf_id not in deleted]
+        )
+    except Exception as e:
+        logger.error(f"Error deleting PDFs: {e}")
+        raise HTTPException(status_code=500, detail="Error deleting PDFs")
+
+@router.post("/pdfs:batchGet", response_model=PDFBatchGetResponse)
+async def batch_get_pdfs(
+    request: PDFBatchGetRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Get several PDFs with all questions and answers in one request
+    
+    PDFs are returned in the order requested, with null for IDs that don't
+    exist; those IDs are also listed in not_found.
+    """
+    def load():
+        return batch_body("pdfs", request.pdf_ids, get_pdfs_by_ids(db, request.pdf_ids), lambda pdf: pdf.pdf_id, pdf_to_dict)
+    
+    try:
+        return Response(content=await run_db(load), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error retrieving {len(request.pdf_ids)} PDFs: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving PDFs")
+
 # -------- Question Endpoints --------
+@router.get("/questions", response_model=QuestionBatchResponse)
+async def get_questions_by_id_list(
+    ids: str = Query(..., description="Comma-separated question IDs, e.g. 1,2,3"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get several questions with their answers in one request
+    
+    Questions are returned in the order requested, with null for IDs that
+    don't exist; those IDs are also listed in not_found.
+    """
+    question_ids = parse_ids(ids)
+    
+    def load():
+        questions = get_questions_by_ids(db, question_ids)
+        return batch_body("questions", question_ids, questions, lambda question: question.question_id, question_to_dict)
+    
+    try:
+        return Response(content=await run_db(load), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error retrieving {len(question_ids)} questions: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving questions")
+
 @router.get("/pdfs/{pdf_id}/questions", response_model=QuestionListResponse)
 async def get_questions_for_pdf(
     pdf_id: int,
@@ -81,11 +320,10 @@ async def get_questions_for_pdf(
     """Get all questions for a specific PDF"""
     try:
         # First check if PDF exists
-        pdf = get_pdf(db, pdf_id)
-        if not pdf:
+        if await run_db(get_pdf_version, db, pdf_id) is None:
             raise HTTPException(status_code=404, detail="PDF not found")
         
-        questions = get_questions_by_pdf(db, pdf_id)
+        questions = await run_db(get_questions_by_pdf, db, pdf_id)
         return QuestionListResponse(questions=questions, total=len(questions), pdf_id=pdf_id)
     except HTTPException:
         raise
@@ -96,14 +334,20 @@ async def get_questions_for_pdf(
 @router.get("/questions/{question_id}", response_model=Question)
 async def get_question_by_id(
     question_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """Get a specific question by ID with all answers"""
-    try:
+    def load():
         question = get_question(db, question_id)
-        if not question:
+        return (question_to_dict(question), question.pdf_id) if question else None
+    
+    try:
+        version = await run_db(get_question_version, db, question_id)
+        response = await versioned_lookup("question", question_id, version, if_none_match, load)
+        if response is None:
             raise HTTPException(status_code=404, detail="Question not found")
-        return question
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -117,7 +361,7 @@ async def delete_question_by_id(
 ):
     """Delete a question and all its answers"""
     try:
-        success = delete_question(db, question_id)
+        success = await run_db(delete_question, db, question_id)
         if not success:
             raise HTTPException(status_code=404, detail="Question not found")
         return {"message": f"Question {question_id} deleted successfully"}
@@ -128,6 +372,29 @@ async def delete_question_by_id(
         raise HTTPException(status_code=500, detail="Error deleting question")
 
 # -------- Answer Endpoints --------
+@router.get("/answers", response_model=AnswerBatchResponse)
+async def get_answers_by_id_list(
+    ids: str = Query(..., description="Comma-separated answer IDs, e.g. 1,2,3"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get several answers in one request
+    
+    Answers are returned in the order requested, with null for IDs that
+    don't exist; those IDs are also listed in not_found.
+    """
+    answer_ids = parse_ids(ids)
+    
+    def load():
+        answers = get_answers_by_ids(db, answer_ids)
+        return batch_body("answers", answer_ids, answers, lambda answer: answer.answer_id, answer_to_dict)
+    
+    try:
+        return Response(content=await run_db(load), media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error retrieving {len(answer_ids)} answers: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving answers")
+
 @router.get("/questions/{question_id}/answers", response_model=AnswerListResponse)
 async def get_answers_for_question(
     question_id: int,
@@ -136,11 +403,10 @@ async def get_answers_for_question(
     """Get all answers for a specific question"""
     try:
         # First check if question exists
-        question = get_question(db, question_id)
-        if not question:
+        if await run_db(get_question_version, db, question_id) is None:
             raise HTTPException(status_code=404, detail="Question not found")
         
-        answers = get_answers_by_question(db, question_id)
+        answers = await run_db(get_answers_by_question, db, question_id)
         return AnswerListResponse(answers=answers, total=len(answers), question_id=question_id)
     except HTTPException:
         raise
@@ -151,14 +417,20 @@ async def get_answers_for_question(
 @router.get("/answers/{answer_id}", response_model=Answer)
 async def get_answer_by_id(
     answer_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """Get a specific answer by ID"""
-    try:
+    def load():
         answer = get_answer(db, answer_id)
-        if not answer:
+        return (answer_to_dict(answer), answer.question.pdf_id) if answer else None
+    
+    try:
+        version = await run_db(get_answer_version, db, answer_id)
+        response = await versioned_lookup("answer", answer_id, version, if_none_match, load)
+        if response is None:
             raise HTTPException(status_code=404, detail="Answer not found")
-        return answer
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -172,7 +444,7 @@ async def delete_answer_by_id(
 ):
     """Delete an answer"""
     try:
-        success = delete_answer(db, answer_id)
+        success = await run_db(delete_answer, db, answer_id)
         if not success:
             raise HTTPException(status_code=404, detail="Answer not found")
         return {"message": f"Answer {answer_id} deleted successfully"}
@@ -182,6 +454,14 @@ async def delete_answer_by_id(
         logger.error(f"Error deleting answer {answer_id}: {e}")
         raise HTTPException(status_code=500, detail="Error deleting answer")
 
+# -------- Cache Endpoints --------
+@router.get("/cache/stats")
+async def response_cache_stats():
+    """
+    Hit/miss counters and size of the lookup response cache
+    """
+    return response_cache.stats()
+
 # -------- Search Endpoints --------
 @router.get("/search/pdf")
 async def search_pdf_by_name(
@@ -190,7 +470,7 @@ async def search_pdf_by_name(
 ):
     """Search for a PDF by name"""
     try:
-        pdf = get_pdf_by_name(db, name)
+        pdf = await run_db(get_pdf_by_name, db, name)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF not found")
         return pdf
@@ -199,3 +479,139 @@ async def search_pdf_by_name(
     except Exception as e:
         logger.error(f"Error searching for PDF {name}: {e}")
         raise HTTPException(status_code=500, detail="Error searching for PDF")
+
+@router.get("/search/pdf-names", response_model=PDFNameSearchResponse)
+async def search_pdf_names(
+    q: str = Query(..., min_length=1, max_length=255, description="Start of, or words from, a PDF name"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of matches to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Type-ahead search of PDF names
+    
+    Matches names starting with q first, then names similar to it (typos,
+    words from the middle of the name). Served from an in-memory index, so
+    it doesn't query the database on each keystroke.
+    """
+    try:
+        if pdf_name_index.needs_load():
+            await run_db(load_pdf_name_index, db)
+        return PDFNameSearchResponse(query=q, matches=pdf_name_index.search(q, limit))
+    except Exception as e:
+        logger.error(f"Error searching PDF names for {q!r}: {e}")
+        raise HTTPException(status_code=500, detail="Error searching PDF names")
+
+@router.get("/search/answers", response_model=AnswerSearchResponse)
+async def search_answer_texts(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search answer texts for"),
+    skip: int = Query(0, ge=0, description="Number of hits to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of hits to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search of answer texts
+    
+    Returns the best matching answers first, each with its PDF, question
+    number, part and a snippet of the text around the match.
+    """
+    try:
+        # Fetch one extra hit to tell whether there is another page
+        hits = await run_db(search_answers, db, q, skip, limit + 1)
+        return AnswerSearchResponse(hits=hits[:limit], query=q, skip=skip, limit=limit, has_more=len(hits) > limit)
+    except SearchUnsupportedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching answers for {q!r}: {e}")
+        raise HTTPException(status_code=500, detail="Error searching answers")
+
+# -------- Export Endpoints --------
+EXPORT_COLUMNS = ("pdf_name", "main_no", "roman_text", "part_no", "answer_text")
+
+# Rows fetched from the cursor, and sent to the client, at a time
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def ndjson_chunks(rows: Iterable[Any]) -> Iterator[bytes]:
+    """Encode export rows as NDJSON, EXPORT_CHUNK_ROWS lines per chunk"""
+    chunk = bytearray()
+    count = 0
+    for row in rows:
+        chunk += dumps_json(dict(zip(EXPORT_COLUMNS, row)))
+        chunk += b"\n"
+        count += 1
+        if count == EXPORT_CHUNK_ROWS:
+            yield bytes(chunk)
+            chunk.clear()
+            count = 0
+    if chunk:
+        yield bytes(chunk)
+
+def csv_chunks(rows: Iterable[Any]) -> Iterator[bytes]:
+    """Encode export rows as CSV with a header, EXPORT_CHUNK_ROWS lines per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count == EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+async def stream_answer_export(
+    export_format: str,
+    uploaded_from: Optional[datetime],
+    uploaded_to: Optional[datetime]
+) -> AsyncIterator[bytes]:
+    """
+    Stream the answer export chunk by chunk
+    
+    Uses its own database session, since the request's session may be closed
+    once the endpoint returns. Each chunk is read and encoded on the database
+    executor; only one chunk is held in memory at a time.
+    """
+    db = get_db_session()
+    rows = iter_answer_export_rows(db, uploaded_from, uploaded_to, batch_size=EXPORT_CHUNK_ROWS)
+    chunks = csv_chunks(rows) if export_format == "csv" else ndjson_chunks(rows)
+    
+    def close():
+        chunks.close()
+        rows.close()  # Releases the server-side cursor if the client went away early
+        db.close()
+    
+    try:
+        while True:
+            chunk = await run_db(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    except Exception as e:
+        logger.error(f"Error exporting answers: {e}")
+        raise
+    finally:
+        await run_db(close)
+
+@router.get("/export/answers")
+async def export_answers(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    uploaded_from: Optional[datetime] = Query(None, description="Only PDFs uploaded at or after this time"),
+    uploaded_to: Optional[datetime] = Query(None, description="Only PDFs uploaded before this time")
+):
+    """
+    Export every answer with its PDF name and question number
+    
+    Streams one row per answer (pdf_name, main_no, roman_text, part_no,
+    answer_text) as NDJSON or CSV, straight from a server-side database
+    cursor, so exports of any size use constant memory.
+    """
+    return StreamingResponse(
+        stream_answer_export(export_format, uploaded_from, uploaded_to),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="answers.{export_format}"'}
+    )
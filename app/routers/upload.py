@@ -1,14 +1,17 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from ..pdf_extractor import process_pdf
-from ..database import get_db
-from ..crud import create_pdf_from_parsed_data, get_pdf_by_name
-from ..schemas import UploadResponse
-import os
-import tempfile
-import shutil
-from typing import Dict, Any
+from ..ingest import ingest_pdf
+from ..jobs import job_manager, JobManagerNotStartedError, QueueFullError
+from ..ingest_worker import enqueue_ingest_job, get_ingest_job_status
+from ..config import settings
+from ..result_cache import get_result_cache
+from ..write_batcher import write_batcher
+from ..database import get_db, get_db_session, run_db
+from ..schemas import UploadResponse, JobAcceptedResponse, JobStatusResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import json
 import logging
 
@@ -16,9 +19,65 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
-@router.post("/answer-sheet", response_model=UploadResponse)
+# Size of the chunks read from the upload buffer while hashing
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def read_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """
+    Read an uploaded file straight from its spooled buffer
+    
+    Returns:
+        Tuple of (file bytes, hex SHA-256 of the content), hashed while reading
+    """
+    await file.seek(0)
+    digest = hashlib.sha256()
+    chunks = []
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+async def enqueue_upload_job(files: List[UploadFile]) -> JSONResponse:
+    """
+    Read the uploaded files and hand them to the background job workers
+    
+    Returns:
+        202 Accepted response with the job ID and its status URL
+    """
+    entries = []
+    for file in files:
+        # Non-PDF files are recorded as failed without being queued
+        if not file.filename.lower().endswith('.pdf'):
+            entries.append({"filename": file.filename, "error": "Only PDF files are allowed"})
+            continue
+        pdf_data, content_sha256 = await read_upload(file)
+        entries.append({"filename": file.filename, "pdf_data": pdf_data, "content_sha256": content_sha256})
+    
+    try:
+        if settings.JOB_BACKEND == "database":
+            job_id = await run_db(enqueue_ingest_job, entries)
+        else:
+            job_id = job_manager.create_job(entries).job_id
+    except (QueueFullError, JobManagerNotStartedError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    status_url = f"{router.prefix}/jobs/{job_id}"
+    logger.info(f"Queued upload job {job_id} with {len(files)} files")
+    return JSONResponse(
+        status_code=202,
+        content=JobAcceptedResponse(job_id=job_id, status="queued", status_url=status_url).model_dump(),
+        headers={"Location": status_url}
+    )
+
+@router.post("/answer-sheet", response_model=UploadResponse, responses={202: {"model": JobAcceptedResponse}})
 async def upload_answer_sheet(
     file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async", description="Queue the file and return 202 with a job ID"),
     db: Session = Depends(get_db)
 ):
     """
@@ -28,184 +87,141 @@ async def upload_answer_sheet(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
-    # Create temporary file
-    temp_dir = tempfile.mkdtemp()
-    temp_file_path = os.path.join(temp_dir, file.filename)
+    if run_async:
+        return await enqueue_upload_job([file])
     
     try:
-        # Save uploaded file to temporary location
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Process PDF using new extractor
-        result = process_pdf(temp_file_path)
+        pdf_data, content_sha256 = await read_upload(file)
+        result = await ingest_pdf(db, file.filename, pdf_data, content_sha256)
         
-        if result["success"]:
-            try:
-                # Check if PDF already exists
-                existing_pdf = get_pdf_by_name(db, file.filename)
-                if existing_pdf:
-                    logger.warning(f"PDF {file.filename} already exists with ID: {existing_pdf.pdf_id}")
-                    return UploadResponse(
-                        filename=file.filename,
-                        extracted_text=result["extracted_text"],
-                        parsed_questions=result["parsed_questions"],
-                        question_count=result["question_count"],
-                        status="success",
-                        pdf_id=existing_pdf.pdf_id
-                    )
-                
-                # Save to database
-                pdf_record = create_pdf_from_parsed_data(
-                    db=db,
-                    pdf_name=file.filename,
-                    parsed_questions=result["parsed_questions"]
-                )
-                
-                logger.info(f"Successfully processed and saved PDF: {file.filename} with ID: {pdf_record.pdf_id}")
-                
-                return UploadResponse(
-                    filename=file.filename,
-                    extracted_text=result["extracted_text"],
-                    parsed_questions=result["parsed_questions"],
-                    question_count=result["question_count"],
-                    status="success",
-                    pdf_id=pdf_record.pdf_id
-                )
-                
-            except Exception as db_error:
-                logger.error(f"Database error while saving PDF {file.filename}: {db_error}")
-                # Return success but without database save
-                return UploadResponse(
-                    filename=file.filename,
-                    extracted_text=result["extracted_text"],
-                    parsed_questions=result["parsed_questions"],
-                    question_count=result["question_count"],
-                    status="success_no_db",
-                    pdf_id=None
-                )
-        else:
+        if result["status"] == "error":
             raise HTTPException(status_code=500, detail=f"PDF processing failed: {result['error']}")
         
+        return UploadResponse(**result)
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+
+async def iter_batch_results(
+    files: List[UploadFile],
+    db: Session,
+    concurrency: int
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Process batch files concurrently, yielding (index, result) as each completes
+    
+    Each file is read only once its turn comes, so at most `concurrency`
+    uploads are held in memory at a time. Extraction runs in worker
+    processes; database steps take turns on the shared session. Pending
+    files are cancelled if iteration stops early.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    db_lock = asyncio.Lock()
+    
+    async def process_file(index: int, file: UploadFile) -> Tuple[int, Dict[str, Any]]:
+        # Validate file type
+        if not file.filename.lower().endswith('.pdf'):
+            return index, {
+                "filename": file.filename,
+                "status": "error",
+                "error": "Only PDF files are allowed"
+            }
+        
+        async with semaphore:
+            try:
+                pdf_data, content_sha256 = await read_upload(file)
+                return index, await ingest_pdf(db, file.filename, pdf_data, content_sha256, db_lock)
+            except Exception as e:
+                return index, {
+                    "filename": file.filename,
+                    "status": "error",
+                    "error": str(e)
+                }
+    
+    tasks = [asyncio.ensure_future(process_file(index, file)) for index, file in enumerate(files)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def batch_summary(total_files: int, results: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count successful and failed results of a batch"""
+    return {
+        "total_files": total_files,
+        "successful": len([r for r in results if r["status"] == "success"]),
+        "failed": len([r for r in results if r["status"] == "error"])
+    }
+
+async def stream_batch_results(files: List[UploadFile], concurrency: int) -> AsyncIterator[bytes]:
+    """
+    Stream one NDJSON line per file as soon as it completes, then a summary line
     
+    Uses its own database session, since the request's session may be closed
+    once the endpoint returns. The uploaded files stay open (spooled to disk
+    if large) until the response has been sent, so each one is read lazily.
+    """
+    db = get_db_session()
+    statuses = []
+    try:
+        async for index, result in iter_batch_results(files, db, concurrency):
+            statuses.append({"status": result["status"]})
+            yield (json.dumps({"index": index, **result}) + "\n").encode("utf-8")
+        yield (json.dumps({"summary": True, **batch_summary(len(files), statuses)}) + "\n").encode("utf-8")
     finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-        if os.path.exists(temp_dir):
-            os.rmdir(temp_dir)
+        db.close()
 
-@router.post("/answer-sheet-batch")
+@router.post("/answer-sheet-batch", responses={202: {"model": JobAcceptedResponse}})
 async def upload_answer_sheets_batch(
     files: list[UploadFile] = File(...),
+    run_async: bool = Query(False, alias="async", description="Queue the files and return 202 with a job ID"),
+    concurrency: int = Query(
+        settings.BATCH_CONCURRENCY, ge=1, le=settings.BATCH_MAX_CONCURRENCY,
+        description="Number of files processed at once"
+    ),
+    accept: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Upload multiple answer sheet PDFs and extract questions and answers
+    
+    Files are processed concurrently (extraction in worker processes,
+    database writes one at a time), and results are returned in input order.
+    
+    With "Accept: application/x-ndjson" the response is streamed instead: one
+    JSON line per file (with its "index") as soon as it completes, followed by
+    a summary line with the total/successful/failed counts.
     """
     if len(files) == 0:
         raise HTTPException(status_code=400, detail="No files provided")
     
-    results = []
-    temp_dir = tempfile.mkdtemp()
+    if run_async:
+        return await enqueue_upload_job(files)
     
-    try:
-        for file in files:
-            # Validate file type
-            if not file.filename.lower().endswith('.pdf'):
-                results.append({
-                    "filename": file.filename,
-                    "status": "error",
-                    "error": "Only PDF files are allowed"
-                })
-                continue
-            
-            temp_file_path = os.path.join(temp_dir, file.filename)
-            
-            try:
-                # Save uploaded file to temporary location
-                with open(temp_file_path, "wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
-                
-                # Process PDF using new extractor
-                result = process_pdf(temp_file_path)
-                
-                if result["success"]:
-                    try:
-                        # Check if PDF already exists
-                        existing_pdf = get_pdf_by_name(db, file.filename)
-                        if existing_pdf:
-                            logger.warning(f"PDF {file.filename} already exists with ID: {existing_pdf.pdf_id}")
-                            results.append({
-                                "filename": file.filename,
-                                "extracted_text": result["extracted_text"],
-                                "parsed_questions": result["parsed_questions"],
-                                "question_count": result["question_count"],
-                                "status": "success",
-                                "pdf_id": existing_pdf.pdf_id
-                            })
-                        else:
-                            # Save to database
-                            pdf_record = create_pdf_from_parsed_data(
-                                db=db,
-                                pdf_name=file.filename,
-                                parsed_questions=result["parsed_questions"]
-                            )
-                            
-                            logger.info(f"Successfully processed and saved PDF: {file.filename} with ID: {pdf_record.pdf_id}")
-                            
-                            results.append({
-                                "filename": file.filename,
-                                "extracted_text": result["extracted_text"],
-                                "parsed_questions": result["parsed_questions"],
-                                "question_count": result["question_count"],
-                                "status": "success",
-                                "pdf_id": pdf_record.pdf_id
-                            })
-                            
-                    except Exception as db_error:
-                        logger.error(f"Database error while saving PDF {file.filename}: {db_error}")
-                        # Return success but without database save
-                        results.append({
-                            "filename": file.filename,
-                            "extracted_text": result["extracted_text"],
-                            "parsed_questions": result["parsed_questions"],
-                            "question_count": result["question_count"],
-                            "status": "success_no_db",
-                            "pdf_id": None
-                        })
-                else:
-                    results.append({
-                        "filename": file.filename,
-                        "status": "error",
-                        "error": result["error"]
-                    })
-                
-            except Exception as e:
-                results.append({
-                    "filename": file.filename,
-                    "status": "error",
-                    "error": str(e)
-                })
-            
-            finally:
-                # Clean up individual file
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-        
-        return JSONResponse(content={
-            "results": results,
-            "total_files": len(files),
-            "successful": len([r for r in results if r["status"] == "success"]),
-            "failed": len([r for r in results if r["status"] == "error"])
-        })
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(stream_batch_results(files, concurrency), media_type=NDJSON_MEDIA_TYPE)
+    
+    results = [None] * len(files)
+    async for index, result in iter_batch_results(files, db, concurrency):
+        results[index] = result
         
-    finally:
-        # Clean up temporary directory
-        if os.path.exists(temp_dir):
-            os.rmdir(temp_dir)
+    return JSONResponse(content={"results": results, **batch_summary(len(files), results)})
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_upload_job(job_id: str):
+    """
+    Get the progress and per-file results of a queued upload job
+    """
+    if settings.JOB_BACKEND == "database":
+        status = await run_db(get_ingest_job_status, job_id)
+    else:
+        job = job_manager.get_job(job_id)
+        status = job.to_dict() if job else None
+    
+    if not status:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
 
 @router.get("/health")
 async def health_check():
@@ -213,3 +229,20 @@ async def health_check():
     Health check endpoint for the upload service
     """
     return {"status": "healthy", "service": "upload"}
+
+@router.get("/cache/stats")
+async def result_cache_stats():
+    """
+    Hit/miss counters and size of the extraction result cache
+    """
+    cache = get_result_cache()
+    if not cache:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/write-batch/stats")
+async def write_batch_stats():
+    """
+    Number and average size of the group commits made by the write batcher
+    """
+    return {"enabled": settings.WRITE_BATCH_ENABLED, **write_batcher.stats()}
@@ -59,6 +59,15 @@ class PDF(PDFBase):
     class Config:
         from_attributes = True
 
+class PDFSummary(PDFBase):
+    pdf_id: int
+    uploaded_at: datetime
+    question_count: int
+    answer_count: int
+    
+    class Config:
+        from_attributes = True
+
 # -------- Upload Response Schemas --------
 class UploadResponse(BaseModel):
     filename: str
@@ -67,6 +76,7 @@ class UploadResponse(BaseModel):
     question_count: int
     status: str
     pdf_id: Optional[int] = None  # Added to return the created PDF ID
+    duplicate: bool = False  # True if the same file content was already stored
 
 class BatchUploadResponse(BaseModel):
     results: List[dict]
@@ -74,6 +84,20 @@ class BatchUploadResponse(BaseModel):
     successful: int
     failed: int
 
+class JobAcceptedResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed
+    total_files: int
+    processed: int
+    successful: int
+    failed: int
+    files: List[dict]
+
 class HealthResponse(BaseModel):
     status: str
     service: str
@@ -82,6 +106,34 @@ class HealthResponse(BaseModel):
 class PDFListResponse(BaseModel):
     pdfs: List[PDF]
     total: int
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page
+
+class PDFSummaryListResponse(BaseModel):
+    pdfs: List[PDFSummary]
+    total: int
+    next_cursor: Optional[str] = None
+
+class PDFBatchDeleteRequest(BaseModel):
+    pdf_ids: List[int] = Field(..., min_length=1, max_length=1000, description="IDs of the PDFs to delete")
+
+class PDFBatchDeleteResponse(BaseModel):
+    deleted: List[int]
+    not_found: List[int]
+
+class PDFBatchGetRequest(BaseModel):
+    pdf_ids: List[int] = Field(..., min_length=1, max_length=100, description="IDs of the PDFs to get")
+
+class PDFBatchGetResponse(BaseModel):
+    pdfs: List[Optional[PDF]]  # In request order, null where the PDF doesn't exist
+    not_found: List[int]
+
+class QuestionBatchResponse(BaseModel):
+    questions: List[Optional[Question]]  # In request order, null where the question doesn't exist
+    not_found: List[int]
+
+class AnswerBatchResponse(BaseModel):
+    answers: List[Optional[Answer]]  # In request order, null where the answer doesn't exist
+    not_found: List[int]
 
 class QuestionListResponse(BaseModel):
     questions: List[Question]
@@ -91,4 +143,32 @@ class QuestionListResponse(BaseModel):
 class AnswerListResponse(BaseModel):
     answers: List[Answer]
     total: int
-    question_id: int
\ No newline at end of file
+    question_id: int
+
+class PDFNameMatch(BaseModel):
+    pdf_id: int
+    pdf_name: str
+    score: float  # 1.0 for prefix matches, else the share of the query's trigrams found in the name
+    match: str  # "prefix" or "fuzzy"
+
+class PDFNameSearchResponse(BaseModel):
+    matches: List[PDFNameMatch]
+    query: str
+
+class AnswerSearchHit(BaseModel):
+    answer_id: int
+    question_id: int
+    pdf_id: int
+    pdf_name: str
+    main_no: int
+    roman_text: str
+    part_no: int
+    snippet: str
+    score: float  # Relevance, higher is better; only comparable within one search
+
+class AnswerSearchResponse(BaseModel):
+    hits: List[AnswerSearchHit]
+    query: str
+    skip: int
+    limit: int
+    has_more: bool
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Fast JSON encoding of PDF trees for GradeMate application
+
+Builds response dictionaries straight from ORM rows, in the same shape and
+field order as the schemas.PDF / Question / Answer models, and encodes them
+with orjson when it is installed. This skips pydantic validation, which is
+most of the cost of serializing sheets with hundreds of answers.
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+import json
+import logging
+
+from .crud import get_pdf
+from .database import get_db_session
+from .models import PDF, Question, Answer
+from .response_cache import response_cache, pdf_tag
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the standard library
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_json(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def answer_to_dict(answer: Answer) -> Dict[str, Any]:
+    """Same shape as schemas.Answer"""
+    return {
+        "roman_text": answer.roman_text,
+        "part_no": answer.part_no,
+        "answer_text": answer.answer_text,
+        "answer_id": answer.answer_id,
+        "question_id": answer.question_id,
+        "created_at": answer.created_at
+    }
+
+def question_to_dict(question: Question) -> Dict[str, Any]:
+    """Same shape as schemas.Question"""
+    return {
+        "main_no": question.main_no,
+        "question_id": question.question_id,
+        "pdf_id": question.pdf_id,
+        "created_at": question.created_at,
+        "answers": [answer_to_dict(answer) for answer in question.answers]
+    }
+
+def pdf_to_dict(pdf: PDF) -> Dict[str, Any]:
+    """Same shape as schemas.PDF"""
+    return {
+        "pdf_name": pdf.pdf_name,
+        "pdf_id": pdf.pdf_id,
+        "uploaded_at": pdf.uploaded_at,
+        "questions": [question_to_dict(question) for question in pdf.questions]
+    }
+
+def warm_pdf_response(pdf_id: int) -> None:
+    """
+    Encode a PDF tree into the response cache, so its first read is a hit
+    
+    Uses its own database session; errors are logged, not raised.
+    """
+    if not response_cache.enabled:
+        return
+    
+    db = get_db_session()
+    try:
+        generation = response_cache.generation
+        pdf = get_pdf(db, pdf_id)
+        if pdf:
+            response_cache.put(("pdf", pdf_id, pdf.version), dumps_json(pdf_to_dict(pdf)), tags=[pdf_tag(pdf_id)], generation=generation)
+    except Exception as e:
+        logger.error(f"Error warming response cache for PDF {pdf_id}: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,190 @@
+"""
+Group-commit writer for GradeMate application
+
+Under burst load every upload committing on its own means one fsync per
+sheet. When enabled, the write batcher collects parsed sheets from
+concurrent uploads for a few milliseconds (or up to a maximum batch size)
+and saves them in a single transaction using the bulk insert path.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from .config import settings
+from .crud import insert_parsed_pdf, get_pdf_by_hash, get_pdf_by_name, invalidate_pdf_count
+from .database import get_db_session, run_db
+from .name_index import pdf_name_index
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of a submitted sheet
+CREATED = "created"
+SAME_NAME = "same_name"  # A PDF with the same name was already stored
+SAME_CONTENT = "same_content"  # A PDF with the same content hash was already stored
+
+# Queued by stop() behind the remaining sheets
+_STOP = object()
+
+class WriteBatcher:
+    """Coalesces concurrent PDF inserts into shared transactions"""
+    
+    def __init__(self, max_batch_size: int, max_delay_ms: float):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.batches = 0
+        self.sheets = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._futures = set()  # Futures of submitted sheets not saved yet
+    
+    async def submit(self, pdf_name: str, parsed_questions: dict, content_sha256: Optional[str] = None) -> Tuple[int, str]:
+        """
+        Queue a parsed sheet for the next group commit and wait for it
+        
+        Returns:
+            Tuple of (pdf_id, outcome), where outcome is CREATED, or
+            SAME_NAME / SAME_CONTENT if an existing PDF was found instead
+        
+        Raises:
+            Exception: If the sheet (or the whole transaction) could not be saved
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        await self._queue.put((pdf_name, parsed_questions, content_sha256, future))
+        return await future
+    
+    async def stop(self) -> None:
+        """Save anything still queued, then stop"""
+        if self._task is None:
+            return
+        # The writer saves everything queued ahead of the sentinel, then returns
+        await self._queue.put(_STOP)
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        
+        # Save sheets submitted while stopping
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+        if batch:
+            await self._write(batch)
+    
+        # Nothing may be left waiting forever, e.g. if the writer itself failed
+        for future in list(self._futures):
+            if not future.done():
+                future.set_exception(RuntimeError("Write batcher stopped before the PDF was saved"))
+    
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            
+            # Collect more sheets until the batch is full or the delay is up
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._write(batch)
+            if stopping:
+                return
+    
+    async def _write(self, batch: List[Tuple[Any, ...]]) -> None:
+        try:
+            outcomes = await run_db(self._persist, [item[:3] for item in batch])
+        except Exception as e:
+            logger.error(f"Group commit of {len(batch)} PDFs failed: {e}")
+            outcomes = [e] * len(batch)
+        
+        for (_, _, _, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+    
+    def _persist(self, sheets: List[Tuple[str, dict, Optional[str]]]) -> List[Any]:
+        """Insert every sheet in one transaction, isolating each in a savepoint"""
+        db = get_db_session()
+        try:
+            outcomes = []
+            pending = []  # (index, PDF) of sheets inserted in this transaction
+            for pdf_name, parsed_questions, content_sha256 in sheets:
+                savepoint = db.begin_nested()
+                try:
+                    pdf = insert_parsed_pdf(db, pdf_name, parsed_questions, content_sha256)
+                    savepoint.commit()
+                    pending.append((len(outcomes), pdf))
+                    outcomes.append(None)
+                except IntegrityError as e:
+                    # Unique conflict on pdf_name or content hash: resolve to the stored row
+                    savepoint.rollback()
+                    outcomes.append(self._resolve_conflict(db, pdf_name, content_sha256, e))
+                except Exception as e:
+                    savepoint.rollback()
+                    outcomes.append(e)
+            
+            # pdf_id is read before commit so the commit doesn't cost extra reloads
+            for index, pdf in pending:
+                outcomes[index] = (pdf.pdf_id, CREATED)
+            db.commit()
+            if pending:
+                invalidate_pdf_count()
+            for index, _ in pending:
+                pdf_name_index.add(outcomes[index][0], sheets[index][0])
+            
+            self.batches += 1
+            self.sheets += len(sheets)
+            logger.info(f"Group commit saved {len(pending)} of {len(sheets)} PDFs")
+            return outcomes
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _resolve_conflict(self, db, pdf_name: str, content_sha256: Optional[str], error: Exception) -> Any:
+        if content_sha256:
+            existing = get_pdf_by_hash(db, content_sha256)
+            if existing:
+                return (existing.pdf_id, SAME_CONTENT)
+        existing = get_pdf_by_name(db, pdf_name)
+        if existing:
+            return (existing.pdf_id, SAME_NAME)
+        return error
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "sheets": self.sheets,
+            "average_batch_size": self.sheets / self.batches if self.batches else 0.0
+        }
+
+write_batcher = WriteBatcher(
+    max_batch_size=settings.WRITE_BATCH_MAX_SIZE,
+    max_delay_ms=settings.WRITE_BATCH_MAX_DELAY_MS
+)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for concurrent /data requests
+Run this script to measure listing throughput and how responsive the event
+loop stays while listings run, with database calls offloaded to the
+database executor ("offloaded") and run directly on the event loop, as
+before ("inline").
+"""
+
+import sys
+import os
+import time
+import asyncio
+import argparse
+import statistics
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from app.database import create_tables, get_db_session, test_connection
+from app.crud import create_pdf_from_parsed_data, get_pdf_by_name
+from app.main import app
+from app.routers import data
+import logging
+
+# Configure logging; per-request and per-query logs would drown the results
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+for noisy in ("httpx", "app", "sqlalchemy.engine"):
+    logging.getLogger(noisy).setLevel(logging.WARNING)
+
+# How often the event loop is probed while listings run (seconds)
+PROBE_INTERVAL = 0.01
+
+def seed_pdfs(count: int, questions: int = 20, parts: int = 5):
+    """Make sure count benchmark PDFs exist"""
+    answers = {"i": "answer", "ii": "answer", "iii": "answer", "iv": "answer", "v": "answer"}
+    parsed_questions = {str(q): dict(list(answers.items())[:parts]) for q in range(1, questions + 1)}
+    db = get_db_session()
+    try:
+        for n in range(count):
+            pdf_name = f"benchmark_{n}.pdf"
+            if not get_pdf_by_name(db, pdf_name):
+                create_pdf_from_parsed_data(db, pdf_name, parsed_questions)
+    finally:
+        db.close()
+
+async def run_inline(func, *args, **kwargs):
+    """Old behaviour: blocking database calls straight on the event loop"""
+    return func(*args, **kwargs)
+
+async def measure(client: httpx.AsyncClient, requests: int, concurrency: int, limit: int):
+    """
+    Send listing requests with the given concurrency while probing a
+    database-free endpoint
+    
+    Returns:
+        Tuple of (listings per second, probe latencies in milliseconds)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    probe_latencies = []
+    done = asyncio.Event()
+    
+    async def listing():
+        async with semaphore:
+            response = await client.get("/data/pdfs", params={"limit": limit})
+            response.raise_for_status()
+    
+    async def probe():
+        # Latency is counted from when the probe was due, so time spent
+        # waiting for a blocked event loop to wake it up is included
+        due = time.perf_counter()
+        while not done.is_set():
+            await client.get("/upload/health")
+            probe_latencies.append((time.perf_counter() - due) * 1000)
+            due = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+    
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(listing() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return requests / elapsed, probe_latencies
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+async def main(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Warm up connections and caches
+        await client.get("/data/pdfs", params={"limit": args.limit})
+        
+        offloaded = data.run_db
+        for mode, runner in (("inline", run_inline), ("offloaded", offloaded)):
+            data.run_db = runner
+            try:
+                throughput, latencies = await measure(client, args.requests, args.concurrency, args.limit)
+            finally:
+                data.run_db = offloaded
+            logger.info(
+                f"{mode:>9}: {throughput:7.1f} listings/s | health probe latency "
+                f"p50 {statistics.median(latencies):7.1f} ms, p99 {percentile(latencies, 0.99):7.1f} ms, "
+                f"max {max(latencies):7.1f} ms ({len(latencies)} probes)"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pdfs", type=int, default=200, help="Number of benchmark PDFs to seed")
+    parser.add_argument("--limit", type=int, default=100, help="Page size of each listing request")
+    parser.add_argument("--requests", type=int, default=50, help="Listing requests per mode")
+    parser.add_argument("--concurrency", type=int, default=10, help="Listing requests in flight at once")
+    args = parser.parse_args()
+    
+    if not test_connection():
+        logger.error("Database connection failed")
+        sys.exit(1)
+    create_tables()
+    seed_pdfs(args.pdfs)
+    
+    asyncio.run(main(args))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the question parser
+Run this script to measure parse_questions_from_text throughput
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.pdf_extractor import parse_questions_from_text, scan_question_spans
+from app.utils import int_to_roman
+import re
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Documented throughput target for parse_questions_from_text (MB/s)
+TARGET_MB_PER_SECOND = 60.0
+
+def build_sample_text(sheets: int = 200, questions: int = 30, parts: int = 6, lines_per_part: int = 4) -> str:
+    """Build synthetic extracted text shaped like a batch of answer sheets"""
+    line = "  The student explains the answer here over a full line of text.  "
+    chunks = []
+    for _ in range(sheets):
+        for question_no in range(1, questions + 1):
+            chunks.append(f"{question_no}.")
+            for part_no in range(1, parts + 1):
+                chunks.append(f"{int_to_roman(part_no)}. First line of the answer")
+                chunks.extend([line] * lines_per_part)
+                chunks.append("")
+    return "\n".join(chunks)
+
+def legacy_parse(text: str):
+    """The original line-by-line parser, kept as the reference for parse_questions_from_text"""
+    questions = {}
+    current_question = None
+    current_part = None
+    current_text = []
+    
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        
+        # Check for question number (e.g., "1.", "2.", etc.)
+        question_match = re.match(r'^(\d+)\.\s*$', line)
+        if question_match:
+            # Save previous question if exists
+            if current_question and current_part:
+                questions[current_question][current_part] = '\n'.join(current_text).strip()
+            
+            # Start new question
+            current_question = question_match.group(1)
+            questions[current_question] = {}
+            current_part = None
+            current_text = []
+            continue
+        
+        # Check for part (e.g., "i.", "ii.", "iii.", etc.)
+        part_match = re.match(r'^([ivxlcdm]+)\.\s*(.*)$', line, re.IGNORECASE)
+        if part_match:
+            # Save previous part if exists
+            if current_question and current_part:
+                questions[current_question][current_part] = '\n'.join(current_text).strip()
+            
+            # Start new part
+            current_part = part_match.group(1).lower()
+            current_text = [part_match.group(2)] if part_match.group(2).strip() else []
+            continue
+        
+        # Regular text line - add to current part
+        if current_question and current_part is not None:
+            current_text.append(line)
+    
+    # Save last part
+    if current_question and current_part:
+        questions[current_question][current_part] = '\n'.join(current_text).strip()
+    
+    return questions
+
+def measure(func, text: str, rounds: int = 5) -> float:
+    """Return the best throughput of func over text in MB/s"""
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best
+
+def main():
+    """Main benchmark function"""
+    text = build_sample_text()
+    logger.info(f"Sample text: {len(text.encode('utf-8')) / (1024 * 1024):.1f} MB")
+    
+    if parse_questions_from_text(text) != legacy_parse(text):
+        logger.error("❌ Parser output differs from the line-by-line parser")
+        return False
+    
+    legacy = measure(legacy_parse, text)
+    spans = measure(scan_question_spans, text)
+    full = measure(parse_questions_from_text, text)
+    
+    logger.info(f"Line-by-line parser:       {legacy:8.1f} MB/s")
+    logger.info(f"scan_question_spans:       {spans:8.1f} MB/s")
+    logger.info(f"parse_questions_from_text: {full:8.1f} MB/s (target: {TARGET_MB_PER_SECOND:.0f} MB/s)")
+    
+    if full < TARGET_MB_PER_SECOND:
+        logger.error("❌ Parser is below the throughput target")
+        return False
+    
+    logger.info("✅ Parser meets the throughput target!")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -8,9 +8,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import get_db_session, test_connection
-from app.crud import create_pdf_from_parsed_data, get_pdf, get_pdfs
+from app.database import engine, get_db_session, test_connection
+from app.crud import create_pdf_from_parsed_data, get_pdf, get_pdf_by_name, get_pdfs
 from app.config import settings
+from sqlalchemy import event
 import logging
 
 # Configure logging
@@ -85,12 +86,124 @@ def test_database_operations():
     finally:
         db.close()
 
+def test_query_counts():
+    """Test that reading PDF trees issues a bounded number of queries"""
+    logger.info("Testing query counts of the data endpoints...")
+    
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
+    db = get_db_session()
+    try:
+        # Enough PDFs, questions and answers that lazy loading would stand out
+        pdf_ids = []
+        for n in range(5):
+            pdf_name = f"test_query_count_{n}.pdf"
+            pdf_record = get_pdf_by_name(db, pdf_name) or create_pdf_from_parsed_data(
+                db=db,
+                pdf_name=pdf_name,
+                parsed_questions={str(q): {"i": "answer i", "ii": "answer ii"} for q in range(1, 6)}
+            )
+            pdf_ids.append(pdf_record.pdf_id)
+        question_id = get_pdf(db, pdf_ids[0]).questions[0].question_id
+    finally:
+        db.close()
+    
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    # Upper bound of queries per endpoint, independent of the number of rows
+    endpoints = {
+        "/data/pdfs?limit=100": 4,  # PDFs, questions, answers and the total count
+        f"/data/pdfs/{pdf_ids[0]}": 4,  # Version for the ETag, then the PDF tree
+        f"/data/pdfs/{pdf_ids[0]}/questions": 3,
+        f"/data/questions/{question_id}": 3,
+    }
+    
+    client = TestClient(app)
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        success = True
+        for url, max_queries in endpoints.items():
+            statements.clear()
+            response = client.get(url)
+            if response.status_code != 200:
+                logger.error(f"GET {url} returned {response.status_code}")
+                success = False
+            elif len(statements) > max_queries:
+                logger.error(f"GET {url} ran {len(statements)} queries, expected at most {max_queries}")
+                success = False
+            else:
+                logger.info(f"GET {url} ran {len(statements)} queries")
+        return success
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+def test_pdf_name_index():
+    """Test the in-memory PDF name index used by type-ahead search"""
+    logger.info("Testing the PDF name index...")
+    
+    from app.name_index import PDFNameIndex
+    
+    failures = []
+    def check(condition, message):
+        if not condition:
+            logger.error(f"❌ {message}")
+            failures.append(message)
+    
+    def names(matches):
+        return [(match["pdf_name"], match["match"]) for match in matches]
+    
+    index = PDFNameIndex(refresh_seconds=0)
+    check(index.needs_load(), "A new index should need loading")
+    
+    # Changes committed while a load is running are replayed on top of its rows
+    check(index.begin_load(), "First load should start")
+    check(not index.begin_load(), "A second load should not start while one is running")
+    check(not index.needs_load(), "The index should not need loading while a load is running")
+    index.add(10, "Late_Upload.pdf")
+    index.remove(2)
+    index.finish_load([(1, "Chemistry_2021.pdf"), (2, "Chem_Notes.pdf"), (3, "Organic_Chem.pdf"), (4, "Physics.pdf")])
+    check(len(index) == 4, f"Expected 4 names after the load, got {len(index)}")
+    check(names(index.search("late")) == [("Late_Upload.pdf", "prefix")], "PDF added during the load should be found")
+    check(names(index.search("chem_notes")) == [], "PDF removed during the load should be gone")
+    check(not index.needs_load(), "Index with refresh_seconds=0 should only load once")
+    
+    # Removing one of several names sharing a prefix (or the same name) leaves the others
+    index.add(20, "chem.pdf")
+    index.add(21, "chem.pdf")
+    index.add(22, "Chemistry_2022.pdf")
+    index.remove(21)
+    index.remove(22)
+    prefix_ids = [match["pdf_id"] for match in index.search("chem") if match["match"] == "prefix"]
+    check(sorted(prefix_ids) == [1, 20], f"Expected prefix matches 1 and 20 after removals, got {prefix_ids}")
+    
+    # Prefix matches come first, then fuzzy ones
+    check(
+        names(index.search("chem")) == [("chem.pdf", "prefix"), ("Chemistry_2021.pdf", "prefix"), ("Organic_Chem.pdf", "fuzzy")],
+        f"Unexpected ordering for 'chem': {names(index.search('chem'))}"
+    )
+    check(names(index.search("chem", limit=1)) == [("chem.pdf", "prefix")], "limit should cap the matches")
+    
+    # A typo still finds the name
+    typo_matches = index.search("Chemsitry")
+    check(
+        names(typo_matches)[:1] == [("Chemistry_2021.pdf", "fuzzy")] and 0 < typo_matches[0]["score"] < 1,
+        f"Expected a fuzzy match for 'Chemsitry', got {names(typo_matches)}"
+    )
+    check(index.search("zzzz") == [], "Unrelated query should match nothing")
+    
+    if not failures:
+        logger.info("✅ PDF name index checks passed")
+    return not failures
+
 def main():
     """Main test function"""
     logger.info("Starting database integration test...")
     logger.info(f"Database URL: {settings.database_url}")
     
-    success = test_database_operations()
+    success = test_pdf_name_index() and test_database_operations() and test_query_counts()
     
     if success:
         logger.info("✅ All tests passed!")
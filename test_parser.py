@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the question parser
+Run this script to check parse_questions_from_text against the original
+line-by-line parser on the sample answers and on random inputs
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.pdf_extractor import parse_questions_from_text
+from benchmark_parser import legacy_parse, build_sample_text
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Line fragments random inputs are built from: headers, near-headers,
+# answer text and the kinds of whitespace PyMuPDF produces
+FRAGMENTS = [
+    "1.", "2.", "12.", " 3. ", "4.\t", "5.\r", "1. text", "1.2.", ".",
+    "i.", "ii.", "IV.", "x. answer", " iii.  spaced ", "v.text", "mix. stuff", "ivx.", "a.", "i",
+    "answer text", "  indented line  ", "more words.", "", " ", "\t", "\r", "\x0c", " ", " x.",
+]
+
+def random_text(rng: random.Random) -> str:
+    lines = []
+    for _ in range(rng.randint(0, 30)):
+        line = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 2)))
+        lines.append(line)
+    return "\n".join(lines)
+
+def test_parser_equivalence(rounds: int = 20000, seed: int = 0):
+    """Test that the single-pass parser matches the line-by-line parser"""
+    logger.info("Testing parser equivalence...")
+    
+    samples = [build_sample_text(sheets=2)]
+    if os.path.exists("test_answers.txt"):
+        with open("test_answers.txt", encoding="utf-8") as f:
+            samples.append(f.read())
+    
+    rng = random.Random(seed)
+    samples.extend(random_text(rng) for _ in range(rounds))
+    
+    for text in samples:
+        expected = legacy_parse(text)
+        actual = parse_questions_from_text(text)
+        if actual != expected:
+            logger.error(f"❌ Parser output differs for input {text!r}: {actual} != {expected}")
+            return False
+    
+    logger.info(f"✅ Parser matched the line-by-line parser on {len(samples)} inputs")
+    return True
+
+def main():
+    """Main test function"""
+    if test_parser_equivalence():
+        logger.info("✅ All tests passed!")
+        return True
+    logger.error("❌ Tests failed!")
+    return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Standalone ingestion worker for the GradeMate backend.
+Drains the shared ingest_jobs queue so ingestion can be scaled separately
+from the read API. Run as many instances as needed.
+"""
+
+import asyncio
+import os
+import logging
+from app.config import settings
+from app.database import create_tables, test_connection
+from app.extraction import get_executor, shutdown_executor
+from app.ingest_worker import IngestWorkerPool
+from app.response_cache import response_cache
+from app.write_batcher import write_batcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def main(workers: int):
+    """Run ingest workers until interrupted"""
+    pool = IngestWorkerPool(workers)
+    pool.start()
+    try:
+        await pool.wait()
+    finally:
+        await pool.stop()
+        await write_batcher.stop()
+
+if __name__ == "__main__":
+    # Number of PDFs this node processes at once
+    workers = int(os.environ.get("WORKER_CONCURRENCY", settings.EXTRACTION_POOL_SIZE or os.cpu_count() or 1))
+    
+    print(f"Starting GradeMate ingest worker in {settings.ENVIRONMENT} mode")
+    print(f"Concurrent jobs: {workers}")
+    
+    if not test_connection():
+        logger.error("Failed to connect to database")
+        raise SystemExit(1)
+    create_tables()
+    get_executor()
+    # This process serves no /data reads, so caching responses would only waste memory
+    response_cache.enabled = False
+    
+    try:
+        asyncio.run(main(workers))
+    except KeyboardInterrupt:
+        logger.info("Ingest worker stopped")
+    finally:
+        shutdown_executor()